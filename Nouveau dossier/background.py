@@ -0,0 +1,140 @@
+import time
+import queue
+import multiprocessing
+
+from solver import solve, SolveCancelled, DEFAULT_BACKEND
+from bitboard import count_solutions
+
+# --- Solver en arrière-plan pour les fenêtres Tk ---
+# La recherche tourne dans un processus séparé (pas de GIL partagé avec la
+# boucle Tk). Les messages remontent par une file lue avec after(), le
+# bouton Annuler et le délai maximal arrêtent le processus. Le même objet
+# sert au comptage des solutions d'un tirage (count).
+# Rien ne bloque la boucle Tk : lectures sans attente, processus arrêté
+# sans join. Chaque lancement a son numéro (job) : un lancement remplacé
+# par un autre est abandonné sans appeler on_done, et sa boucle de lecture
+# s'arrête.
+
+POLL_MS = 50
+
+def _worker(messages, cancel, board, remaining, backend):
+    def progress(nodes):
+        try:
+            messages.put_nowait(("progress", nodes))
+        except queue.Full:
+            pass
+        return cancel.is_set()
+    try:
+        solution = solve(board, remaining, backend=backend, progress=progress)
+        messages.put(("done", solution))
+    except SolveCancelled:
+        messages.put(("cancelled", None))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
+def _count_worker(messages, cancel, blocked, remaining, cap):
+    try:
+        total = count_solutions(blocked, remaining, cap, progress=lambda nodes: cancel.is_set())
+        messages.put(("done", total))
+    except SolveCancelled:
+        messages.put(("cancelled", None))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
+class BackgroundSolver:
+    def __init__(self, widget, on_done, on_progress=None, timeout=30.0):
+        # on_done(statut, solution) avec statut "done", "cancelled",
+        # "timeout" ou "error" ; on_progress(noeuds) pendant la recherche
+        self.widget = widget
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.timeout = timeout
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.job = 0
+        self._after = None
+
+    @property
+    def running(self):
+        return self.process is not None
+
+    def start(self, board, remaining, backend=DEFAULT_BACKEND):
+        self._spawn(_worker, board, list(remaining), backend)
+
+    def count(self, blocked, remaining, cap=None, budget=0.010):
+        # Nombre de solutions (bitboard.count_solutions) : calculé tout de
+        # suite s'il tient en `budget` secondes (on_done appelé avant le
+        # retour), sinon dans le processus séparé
+        if self.running:
+            self._finish(None, None)
+        deadline = time.perf_counter() + budget
+        try:
+            total = count_solutions(blocked, remaining, cap, progress=lambda nodes: time.perf_counter() > deadline)
+        except SolveCancelled:
+            self._spawn(_count_worker, blocked, list(remaining), cap)
+            return
+        self.on_done("done", total)
+
+    def _spawn(self, target, *args):
+        if self.running:
+            self._finish(None, None)
+        self.job += 1
+        self.dead_polls = 0
+        self.messages = self.context.Queue(maxsize=64)
+        self.cancel_event = self.context.Event()
+        self.process = self.context.Process(
+            target=target,
+            args=(self.messages, self.cancel_event) + args,
+            daemon=True)
+        self.process.start()
+        self.deadline = time.time() + self.timeout if self.timeout else None
+        self._schedule()
+
+    def _schedule(self):
+        job = self.job
+        self._after = self.widget.after(POLL_MS, lambda: self._poll(job))
+
+    def cancel(self):
+        self._finish("cancelled", None)
+
+    def _finish(self, status, solution):
+        # status None : lancement remplacé, on_done n'est pas appelé
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        if self._after is not None:
+            self.widget.after_cancel(self._after)
+            self._after = None
+        if process.is_alive():
+            self.cancel_event.set()
+            process.terminate()
+        if status is not None:
+            self.on_done(status, solution)
+
+    def _poll(self, job):
+        if job != self.job or self.process is None:
+            return
+        self._after = None
+        alive = self.process.is_alive()
+        while True:
+            try:
+                kind, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if self.on_progress:
+                    self.on_progress(value)
+            else:
+                self._finish(kind, value)
+                return
+        if not alive:
+            # Son dernier message peut être encore en transit : on relit
+            # une fois au tour suivant avant de conclure
+            if self.dead_polls:
+                self._finish("error", "Le processus du solver s'est arrêté")
+                return
+            self.dead_polls += 1
+        elif self.deadline is not None and time.time() > self.deadline:
+            self._finish("timeout", None)
+            return
+        self._schedule()
@@ -0,0 +1,59 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pieces import PIECES, CELLS
+from placements import PLACEMENTS
+
+# --- Légalité des placements sur beaucoup de plateaux à la fois (NumPy) ---
+# Pour N plateaux (masques uint64 des cases occupées) et P placements, une
+# seule opération donne la matrice N x P des placements posables, puis le
+# nombre de candidats par case (N x 36) et par pièce (N x pièces).
+# Mémoire : N x P octets pour la matrice (P = 856 pour toutes les pièces),
+# découper les très gros lots avec iter_feasibility().
+# Sans NumPy, seul piece_candidates() marche (boucle Python, plus lente).
+
+class PlacementTable:
+    def __init__(self, pieces=None):
+        if np is None:
+            raise ImportError("PlacementTable demande NumPy (pip install numpy)")
+        self.pieces = list(PIECES) if pieces is None else list(pieces)
+        masks = [m for p in self.pieces for m in PLACEMENTS[p]]
+        self.masks = np.array(masks, dtype=np.uint64)
+        self.owner = np.repeat(np.arange(len(self.pieces)), [len(PLACEMENTS[p]) for p in self.pieces])
+        # cover[k, c] = 1 si le placement k couvre la case c
+        bits = np.arange(CELLS, dtype=np.uint64)
+        # (float32 : le produit matriciel passe par BLAS, les comptes restent exacts)
+        self.cover = ((self.masks[:, None] >> bits[None, :]) & np.uint64(1)).astype(np.float32)
+        # piece_of[k, i] = 1 si le placement k est une pose de la pièce i
+        self.piece_of = np.zeros((len(masks), len(self.pieces)), dtype=np.float32)
+        self.piece_of[np.arange(len(masks)), self.owner] = 1
+
+    def legality(self, boards):
+        boards = np.asarray(boards, dtype=np.uint64)
+        return (boards[:, None] & self.masks[None, :]) == 0
+
+    def feasibility(self, boards):
+        # (légalité N x P, candidats par case N x 36, candidats par pièce N x pièces)
+        legal = self.legality(boards)
+        weights = legal.astype(np.float32)
+        return legal, (weights @ self.cover).astype(np.int32), (weights @ self.piece_of).astype(np.int32)
+
+    def iter_feasibility(self, boards, chunk=65536):
+        boards = np.asarray(boards, dtype=np.uint64)
+        for start in range(0, len(boards), chunk):
+            yield start, self.feasibility(boards[start:start + chunk])
+
+def feasibility(boards, pieces=None):
+    return PlacementTable(pieces).feasibility(boards)
+
+def piece_candidates(boards, pieces=None, chunk=65536):
+    # Nombre de placements posables de chaque pièce, une liste par plateau
+    pieces = list(PIECES) if pieces is None else list(pieces)
+    if np is None:
+        return [[sum(1 for m in PLACEMENTS[p] if not board & m) for p in pieces] for board in boards]
+    counts = []
+    for _, (_, _, per_piece) in PlacementTable(pieces).iter_feasibility(boards, chunk):
+        counts.extend(per_piece.tolist())
+    return counts
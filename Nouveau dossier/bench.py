@@ -0,0 +1,192 @@
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+
+import dice
+from pieces import GRID_SIZE, PIECES, blockers_mask
+from solver import solve, BACKENDS, SolveCancelled
+from stats import SolveStats
+
+# --- Banc d'essai des solvers ---
+# Corpus fixes (graine donnée) tirés des deux modèles de dés du dépôt :
+#   dice    : la vraie table de rollDice() (7 cases bloquées)
+#   sample6 : random.sample(cases, 6) comme geniusDicee / zzzzz
+# et trois niveaux de difficulté selon les pièces à placer :
+#   easy : 4 pièces, typical : 6 pièces, hard : 7 pièces qui remplissent
+#   presque tout le plateau (29 cases).
+# Chaque solver est chronométré sur chaque corpus ; le résultat (noeuds/s,
+# latences p50/p99, pic mémoire) est écrit en JSON et peut être comparé à
+# un fichier précédent avec --compare.
+# Deux passes par corpus : une passe comptée (stats, délai maximal par
+# tirage) donne les noeuds de chaque tirage et repère ceux qui dépassent le
+# délai ; puis les tirages terminés sont chronométrés sans stats ni
+# progress, sur le chemin rapide des applications. Les tirages hors délai
+# comptent pour `timeout` dans les latences.
+
+TIERS = {"easy": 4, "typical": 6, "hard": 7}
+HARD_PIECES = "LNTUVWZ"
+
+def roll_blockers(model, rng):
+    if model == "dice":
+        return blockers_mask(dice.roll_dice(rng))
+    all_cells = [(r,c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+    return blockers_mask(rng.sample(all_cells, 6))
+
+def build_corpora(size=50, seed=0):
+    corpora = {}
+    for model in ("dice", "sample6"):
+        for tier, n in TIERS.items():
+            rng = random.Random(f"{seed}-{model}-{tier}")
+            cases = []
+            for _ in range(size):
+                blocked = roll_blockers(model, rng)
+                pieces = list(HARD_PIECES) if tier == "hard" else rng.sample(list(PIECES), n)
+                cases.append((blocked, pieces))
+            corpora[f"{model}/{tier}"] = cases
+    return corpora
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+def count_nodes(backend, cases, timeout):
+    # Noeuds de chaque tirage (None s'il dépasse le délai) et stats des tirages terminés
+    counts = []
+    total = SolveStats()
+    for blocked, pieces in cases:
+        stats = SolveStats()
+        deadline = time.perf_counter() + timeout
+        try:
+            solve(blocked, pieces, backend=backend, stats=stats,
+                  progress=lambda n: time.perf_counter() > deadline)
+        except SolveCancelled:
+            counts.append(None)
+            continue
+        counts.append(stats.nodes)
+        total.merge(stats)
+    return counts, total
+
+def time_cases(backend, cases):
+    latencies = []
+    solved = 0
+    for blocked, pieces in cases:
+        start = time.perf_counter()
+        solved += solve(blocked, pieces, backend=backend) is not None
+        latencies.append(time.perf_counter() - start)
+    return latencies, solved
+
+def run_corpus(backend, cases, timeout):
+    counts, total = count_nodes(backend, cases, timeout)
+    finished = [case for case, n in zip(cases, counts) if n is not None]
+    latencies, solved = time_cases(backend, finished)
+    timeouts = len(cases) - len(finished)
+    seconds = sum(latencies)
+    latencies += [timeout] * timeouts
+    return {
+        "cases": len(cases),
+        "solved": solved,
+        "timeouts": timeouts,
+        "nodes": total.nodes,
+        "case_nodes": counts,
+        "seconds": seconds,
+        "nodes_per_sec": total.nodes / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "stats": total.as_dict(),
+    }, finished
+
+def peak_memory(backend, cases):
+    # Passe séparée : tracemalloc ralentit trop pour chronométrer en même temps
+    tracemalloc.start()
+    try:
+        time_cases(backend, cases)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+def run(backends=None, size=50, seed=0, timeout=5.0, memory=True):
+    corpora = build_corpora(size, seed)
+    report = {
+        "commit": git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "seed": seed,
+        "size": size,
+        "timeout": timeout,
+        "results": {},
+    }
+    for backend in backends or list(BACKENDS):
+        report["results"][backend] = {}
+        for name, cases in corpora.items():
+            result, finished = run_corpus(backend, cases, timeout)
+            if memory:
+                result["peak_bytes"] = peak_memory(backend, finished)
+            report["results"][backend][name] = result
+            print(f"{backend:13} {name:16} {result['solved']:3}/{result['cases']} résolus  "
+                  f"{result['nodes_per_sec']:9.0f} noeuds/s  p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms")
+    return report
+
+def common_nodes(before, after):
+    # Noeuds des tirages terminés dans les deux passes : ceux d'un tirage
+    # arrêté par le délai dépendent de la vitesse de la machine
+    old, new = before.get("case_nodes"), after.get("case_nodes")
+    if old is None or new is None or len(old) != len(new):
+        if before["timeouts"] or after["timeouts"]:
+            return None
+        return before["nodes"], after["nodes"]
+    pairs = [(a, b) for a, b in zip(old, new) if a is not None and b is not None]
+    return sum(a for a, _ in pairs), sum(b for _, b in pairs)
+
+def compare(old, new, threshold=0.25):
+    # Affiche l'évolution du p50 et des noeuds ; renvoie le nombre de régressions.
+    # Les noeuds sont déterministes (toute hausse compte), le temps est bruité.
+    regressions = 0
+    for backend, corpora in new["results"].items():
+        for name, result in corpora.items():
+            before = old.get("results", {}).get(backend, {}).get(name)
+            if not before or not before["p50_ms"]:
+                continue
+            ratio = result["p50_ms"] / before["p50_ms"]
+            nodes = common_nodes(before, result)
+            flag = ""
+            if ratio > 1 + threshold or (nodes is not None and nodes[1] > nodes[0]):
+                flag = "  <-- RÉGRESSION"
+                regressions += 1
+            shown = "non comparés (délai)" if nodes is None else f"{nodes[0]} -> {nodes[1]}"
+            print(f"{backend:13} {name:16} p50 x{ratio:5.2f}  noeuds {shown}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chronomètre les solvers sur des corpus de tirages fixes.")
+    parser.add_argument("-b", "--backend", action="append", choices=list(BACKENDS), help="solver à mesurer (tous par défaut)")
+    parser.add_argument("-n", "--size", type=int, default=50, help="tirages par corpus")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-t", "--timeout", type=float, default=5.0, help="secondes max par tirage")
+    parser.add_argument("-o", "--output", help="fichier JSON (défaut : bench-<commit>.json)")
+    parser.add_argument("--compare", help="résultats précédents à comparer")
+    parser.add_argument("--threshold", type=float, default=0.25, help="hausse du p50 tolérée par --compare")
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    args = parser.parse_args()
+
+    report = run(args.backend, args.size, args.seed, args.timeout, not args.no_memory)
+    output = args.output or f"bench-{report['commit']}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats écrits dans {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(json.load(f), report, args.threshold):
+                sys.exit(1)
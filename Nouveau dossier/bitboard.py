@@ -0,0 +1,267 @@
+from pieces import PIECES, SIZES, CELLS, FULL, GRID_SIZE, mask_coords, blockers_mask
+from placements import PLACEMENTS, BY_CELL, COVERING
+
+# --- Régions vides ---
+# Les bits vont de 6 en 6 d'une colonne à l'autre (voir pieces.py) : un
+# décalage de 1 change de ligne, un décalage de 6 change de colonne.
+
+EDGE_LOW = sum(1 << i for i in range(0, CELLS, GRID_SIZE))
+EDGE_HIGH = EDGE_LOW << (GRID_SIZE - 1)
+
+def neighbours(mask):
+    return (((mask << 1) & ~EDGE_LOW) | ((mask >> 1) & ~EDGE_HIGH)
+            | (mask << GRID_SIZE) | (mask >> GRID_SIZE)) & FULL
+
+def regions(free):
+    # Composantes connexes des cases libres, par remplissage bit à bit
+    while free:
+        region = free & -free
+        while True:
+            grown = (region | neighbours(region)) & free
+            if grown == region:
+                break
+            region = grown
+        yield region
+        free &= ~region
+
+def capacities(sizes):
+    # cap[n] : plus grand nombre de cases <= n couvrable par des pièces de
+    # tailles `sizes` (chaque pièce au plus une fois)
+    reachable = 1
+    for size in sizes:
+        reachable |= reachable << size
+    cap = [0] * (CELLS + 1)
+    for n in range(1, CELLS + 1):
+        cap[n] = n if reachable >> n & 1 else cap[n - 1]
+    return cap
+
+def dead_end(occupied, cap, need):
+    # Vrai si les régions vides ne peuvent plus accueillir `need` cases
+    total = 0
+    for region in regions(~occupied & FULL):
+        total += cap[region.bit_count()]
+        if total >= need:
+            return False
+    return True
+
+# --- Suivi et annulation ---
+# progress : fonction optionnelle appelée tous les PROGRESS_EVERY noeuds
+# avec le nombre de noeuds ; si elle renvoie True, la recherche s'arrête
+# en levant SolveCancelled.
+# stats : SolveStats optionnel (voir stats.py).
+# Chaque solver n'a qu'une recherche : avec stats ou progress, elle reçoit
+# un Trace qui compte ; sans, trace vaut None et chaque point de comptage
+# ne coûte qu'un test.
+
+PROGRESS_EVERY = 512
+
+class SolveCancelled(Exception):
+    pass
+
+class Trace:
+    def __init__(self, stats=None, progress=None):
+        self.stats = stats
+        self.progress = progress
+        self.on_depth = stats.on_depth if stats is not None else None
+        self.nodes = 0
+        self.backtracks = 0
+        self.prunes = 0
+        self.max_depth = 0
+
+    def node(self, depth, occupied):
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.on_depth is not None:
+            self.on_depth(depth, occupied)
+        if self.progress is not None and self.nodes % PROGRESS_EVERY == 0 and self.progress(self.nodes):
+            raise SolveCancelled()
+
+    def record(self, reason):
+        # Reporte les compteurs dans stats (prunes : branches coupées pour `reason`)
+        if self.stats is not None:
+            self.stats.record(self.nodes, self.backtracks, {reason: self.prunes}, self.max_depth)
+
+def tracer(stats, progress):
+    return Trace(stats, progress) if stats is not None or progress is not None else None
+
+# --- Solver bitboard ---
+# Le plateau est un entier de 36 bits (numérotation de pieces.py) :
+# un placement se teste avec un AND et se pose avec un OR. Après chaque
+# placement, on coupe la branche si les régions vides isolées ne peuvent
+# plus contenir les pièces restantes (pièces de 4 et 5 cases).
+
+def solve(blocked, remaining, stats=None, progress=None):
+    remaining = list(remaining)
+    if sum(SIZES[p] for p in remaining) > CELLS - blocked.bit_count():
+        if stats is not None:
+            stats.prune("size")
+        return None
+    tables = [PLACEMENTS[p] for p in remaining]
+    need = [sum(SIZES[p] for p in remaining[k:]) for k in range(len(remaining) + 1)]
+    caps = [capacities([SIZES[p] for p in remaining[k:]]) for k in range(len(remaining) + 1)]
+    chosen = []
+    trace = tracer(stats, progress)
+
+    def search(occupied, k):
+        if trace is not None:
+            trace.node(k, occupied)
+        if k == len(tables):
+            return True
+        if dead_end(occupied, caps[k], need[k]):
+            if trace is not None:
+                trace.prunes += 1
+            return False
+        for m in tables[k]:
+            if not occupied & m:
+                chosen.append(m)
+                if search(occupied | m, k + 1):
+                    return True
+                chosen.pop()
+                if trace is not None:
+                    trace.backtracks += 1
+        return False
+
+    try:
+        found = search(blocked, 0)
+    finally:
+        if trace is not None:
+            trace.record("region")
+    if not found:
+        return None
+    return {p: mask_coords(m) for p, m in zip(remaining, chosen)}
+
+# --- Recherche case par case ---
+# Au lieu de prendre les pièces dans l'ordre, on décide toujours d'une case
+# vide : soit une pièce la couvre, soit elle reste vide (s'il y a des cases
+# en trop). Chaque solution n'est atteinte que par un seul chemin.
+# choice="first" : case vide la plus basse, seuls les placements dont c'est
+#                  la case la plus basse (BY_CELL) peuvent la couvrir
+# choice="fewest" : case vide avec le moins de placements possibles
+
+def fewest_cell(occupied, indexes):
+    empty = ~occupied & FULL
+    best, best_count = -1, CELLS * 256
+    while empty:
+        bit = empty & -empty
+        cell = bit.bit_length() - 1
+        count = 0
+        for index in indexes:
+            for m in index[cell]:
+                if not occupied & m:
+                    count += 1
+        if count < best_count:
+            best, best_count = cell, count
+            if count == 0:
+                break
+        empty ^= bit
+    return best
+
+def solve_cells(blocked, remaining, stats=None, progress=None, choice="first"):
+    remaining = list(remaining)
+    n = len(remaining)
+    sizes = [SIZES[p] for p in remaining]
+    if sum(sizes) > CELLS - blocked.bit_count():
+        if stats is not None:
+            stats.prune("size")
+        return None
+    index = [(BY_CELL if choice == "first" else COVERING)[p] for p in remaining]
+    caps = {}
+    chosen = [0] * n
+
+    def next_cell(occupied, left, need):
+        # Case à décider, ou None si la branche est morte
+        if left not in caps:
+            caps[left] = capacities([sizes[i] for i in range(n) if left >> i & 1])
+        if dead_end(occupied, caps[left], need):
+            return None
+        if choice == "first":
+            empty = ~occupied & FULL
+            return (empty & -empty).bit_length() - 1
+        return fewest_cell(occupied, [index[i] for i in range(n) if left >> i & 1])
+
+    trace = tracer(stats, progress)
+
+    def search(occupied, left, need, depth):
+        if trace is not None:
+            trace.node(depth, occupied)
+        if not left:
+            return True
+        cell = next_cell(occupied, left, need)
+        if cell is None:
+            if trace is not None:
+                trace.prunes += 1
+            return False
+        for i in range(n):
+            if left >> i & 1:
+                for m in index[i][cell]:
+                    if not occupied & m:
+                        chosen[i] = m
+                        if search(occupied | m, left & ~(1 << i), need - sizes[i], depth + 1):
+                            return True
+                        if trace is not None:
+                            trace.backtracks += 1
+        # La case reste vide si les pièces tiennent encore dans le reste
+        if CELLS - occupied.bit_count() > need:
+            return search(occupied | 1 << cell, left, need, depth + 1)
+        return False
+
+    try:
+        found = search(blocked, (1 << n) - 1, sum(sizes), 0)
+    finally:
+        if trace is not None:
+            trace.record("region")
+    if not found:
+        return None
+    return {p: mask_coords(m) for p, m in zip(remaining, chosen)}
+
+# --- Comptage de toutes les solutions ---
+# Les pièces sont distinctes (L et V ont la même forme mais pas la même
+# couleur) : échanger L et V donne une autre solution.
+# Le temps dépend beaucoup du tirage : quelques ms en général, plusieurs
+# secondes pour certains tirages à 5 ou 6 pièces (même avec un plafond, les
+# tirages à peu de solutions explorent tout). progress permet de borner le
+# calcul comme pour solve() ; voir background.BackgroundSolver.count.
+
+SLACK_PRUNE = 8
+
+def count_solutions(blockers, remaining=None, cap=None, progress=None):
+    if not isinstance(blockers, int):
+        blockers = blockers_mask(blockers)
+    remaining = list(PIECES) if remaining is None else list(remaining)
+    # Les grosses pièces d'abord : moins de placements libres à chaque niveau
+    remaining.sort(key=lambda p: -SIZES[p])
+    tables = [PLACEMENTS[p] for p in remaining]
+    need = [sum(SIZES[p] for p in remaining[k:]) for k in range(len(remaining) + 1)]
+    caps = [capacities([SIZES[p] for p in remaining[k:]]) for k in range(len(remaining) + 1)]
+    memo = {}
+    trace = tracer(None, progress)
+
+    def count(occupied, k, limit):
+        if trace is not None:
+            trace.node(k, occupied)
+        if k == len(tables):
+            return 1
+        slack = CELLS - occupied.bit_count() - need[k]
+        if slack < 0:
+            return 0
+        key = (occupied, k)
+        if key in memo:
+            return memo[key]
+        # Avec beaucoup de cases en trop, les régions coupent rarement : on
+        # ne paie le remplissage qu'en fin de partie
+        if slack < SLACK_PRUNE and dead_end(occupied, caps[k], need[k]):
+            memo[key] = 0
+            return 0
+        total = 0
+        for m in tables[k]:
+            if not occupied & m:
+                total += count(occupied | m, k + 1, limit - total)
+                if total >= limit:
+                    # Résultat tronqué par le plafond : on ne le mémorise pas
+                    return total
+        memo[key] = total
+        return total
+
+    total = count(blockers, 0, cap if cap else float("inf"))
+    return min(total, cap) if cap else total
@@ -0,0 +1,97 @@
+import shelve
+from collections import OrderedDict
+
+from pieces import board_mask
+from solver import solve, DEFAULT_BACKEND
+from symmetry import canonical, from_canonical, transform_solution
+from rank import index
+
+# --- Cache des solutions ---
+# Clé : rang des cases bloquées (rank.index, numérotation de convertMultiple()
+# dans geniusDice.py) + pièces restantes. Une LRU bornée en mémoire répond aux
+# tirages répétés, un shelve sur disque survit aux redémarrages. solve()
+# range les solutions sous le masque canonique (symmetry.py) : les 8
+# rotations / miroirs d'un tirage partagent la même entrée.
+
+CACHE_FILE = "solutions.cache"
+
+class SolutionCache:
+    def __init__(self, capacity=4096, path=CACHE_FILE):
+        self.capacity = capacity
+        self.path = path
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._disk = None
+
+    @staticmethod
+    def key(blocked, remaining):
+        return f"{index(blocked)}:{''.join(sorted(remaining))}"
+
+    def _open(self):
+        if self._disk is None and self.path:
+            self._disk = shelve.open(self.path, flag="c")
+        return self._disk
+
+    def _remember(self, key, solution):
+        self.memory[key] = solution
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def get(self, blocked, remaining):
+        # Renvoie (trouvé, solution) : une solution None est aussi mise en cache
+        key = self.key(blocked, remaining)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return True, self.memory[key]
+        disk = self._open()
+        if disk is not None and key in disk:
+            solution = disk[key]
+            self._remember(key, solution)
+            self.disk_hits += 1
+            return True, solution
+        self.misses += 1
+        return False, None
+
+    def put(self, blocked, remaining, solution):
+        key = self.key(blocked, remaining)
+        self._remember(key, solution)
+        disk = self._open()
+        if disk is not None:
+            disk[key] = solution
+            disk.sync()
+
+    def lookup(self, board, remaining):
+        # Comme get(), mais sous le masque canonique et dans l'orientation de board
+        blocked = board if isinstance(board, int) else board_mask(board)
+        canon, t = canonical(blocked)
+        found, solution = self.get(canon, remaining)
+        return found, from_canonical(solution, t)
+
+    def store(self, board, remaining, solution):
+        blocked = board if isinstance(board, int) else board_mask(board)
+        canon, t = canonical(blocked)
+        self.put(canon, remaining, transform_solution(solution, t))
+
+    def solve(self, board, remaining, backend=DEFAULT_BACKEND, stats=None):
+        found, solution = self.lookup(board, remaining)
+        if stats is not None:
+            if found:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+        if not found:
+            solution = solve(board, remaining, backend=backend, stats=stats)
+            self.store(board, remaining, solution)
+        return solution
+
+    def counters(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "size": len(self.memory)}
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
@@ -0,0 +1,132 @@
+import random
+import itertools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pieces import GRID_SIZE, CELLS, CELL_COORDS, coord_name, to_cell, blockers_mask
+
+# --- Dés de Genius Square ---
+# "real" : la table de rollDice() dans geniusDice.py, sept dés dont certains
+#          ont des faces répétées (le dernier n'a que A6 et F1) ; les faces
+#          des dés sont disjointes, un tirage bloque toujours 7 cases.
+# "sampleN" : N cases distinctes tirées uniformément (sample6 est le modèle
+#          de geniusDice2, geniusDicee et zzzzz).
+
+DES = [
+    ['A1', 'C1', 'D1', 'D2', 'E2', 'F3'],
+    ['A4', 'B5', 'C5', 'C6', 'D6', 'F6'],
+    ['D5', 'E4', 'E5', 'E6', 'F4', 'F5'],
+    ['A5', 'F2', 'A5', 'F2', 'B6', 'E1'],
+    ['A2', 'A3', 'B1', 'B2', 'B3', 'C2'],
+    ['B4', 'C3', 'C4', 'D3', 'D4', 'E3'],
+    ['A6', 'A6', 'A6', 'F1', 'F1', 'F1']
+]
+
+# Faces distinctes de chaque dé, dans l'ordre d'apparition
+FACES = [list(dict.fromkeys(de)) for de in DES]
+
+def roll_dice(rng=random):
+    return [de[rng.randint(0, 5)] for de in DES]
+
+def outcomes():
+    # Tous les tirages distincts (6*6*6*4*6*6*2 = 62208), dans un ordre fixe
+    return itertools.product(*FACES)
+
+def count_outcomes():
+    n = 1
+    for faces in FACES:
+        n *= len(faces)
+    return n
+
+def roll_mask(roll):
+    return blockers_mask(roll)
+
+# --- Variantes ---
+
+VARIANTS = ["real", "sample6"]
+ALL_COORDS = [(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+
+def sample_count(variant):
+    # Nombre de cases d'une variante "sampleN", ou ValueError
+    if variant.startswith("sample") and variant[6:].isdigit() and 0 < int(variant[6:]) <= CELLS:
+        return int(variant[6:])
+    raise ValueError(f"Dés inconnus : {variant} (disponibles : {', '.join(VARIANTS)}, sampleN)")
+
+def roll_cells(variant="real", rng=random):
+    # Cases bloquées (r, c) d'un tirage
+    if variant == "real":
+        return [CELL_COORDS[to_cell(face)] for face in roll_dice(rng)]
+    return rng.sample(ALL_COORDS, sample_count(variant))
+
+def roll_names(variant="real", rng=random):
+    # Même tirage sous forme "B3"
+    return [coord_name(r, c) for r, c in roll_cells(variant, rng)]
+
+# --- Tirages en masse (NumPy) ---
+# roll_many(n, seed) renvoie n masques de cases bloquées (uint64, même
+# numérotation que pieces.py). Même graine => mêmes tirages.
+
+def _face_masks():
+    # FACE_MASKS[d, k] = masque de la face k du dé d (faces répétées comprises)
+    return np.array([[1 << to_cell(face) for face in de] for de in DES], dtype=np.uint64)
+
+FACE_MASKS = None if np is None else _face_masks()
+
+def roll_many(n, seed=None, variant="real"):
+    if np is None:
+        raise ImportError("roll_many() demande NumPy (pip install numpy)")
+    rng = np.random.default_rng(seed)
+    if variant == "real":
+        faces = rng.integers(0, 6, size=(n, len(DES)), dtype=np.uint8)
+        masks = np.zeros(n, dtype=np.uint64)
+        for d in range(len(DES)):
+            masks |= FACE_MASKS[d][faces[:, d]]
+        return masks
+    # Algorithme de Floyd : k cases distinctes en k tirages, sans rejet
+    k = sample_count(variant)
+    masks = np.zeros(n, dtype=np.uint64)
+    one = np.uint64(1)
+    for j in range(CELLS - k, CELLS):
+        t = rng.integers(0, j + 1, size=n, dtype=np.uint64)
+        bit = one << t
+        taken = (masks & bit) != 0
+        masks |= np.where(taken, one << np.uint64(j), bit)
+    return masks
+
+# --- Rang d'un tirage ---
+# Base mixte sur FACES, dans l'ordre de outcomes() : le rang d'un tirage
+# est sa position dans outcomes() (et son "index" dans sweep.jsonl).
+
+RADIX = [len(faces) for faces in FACES]
+FACE_INDEX = [{face: k for k, face in enumerate(faces)} for faces in FACES]
+
+def roll_rank(roll):
+    # roll : une face par dé, dans l'ordre de DES ("B3" ou [r, c])
+    rank = 0
+    for d, cell in enumerate(roll):
+        name = cell if isinstance(cell, str) else coord_name(*cell)
+        if name not in FACE_INDEX[d]:
+            raise ValueError(f"{name} n'est pas une face du dé {d + 1}")
+        rank = rank * RADIX[d] + FACE_INDEX[d][name]
+    return rank
+
+def roll_unrank(rank):
+    roll = []
+    for d in reversed(range(len(FACES))):
+        rank, k = divmod(rank, RADIX[d])
+        roll.append(FACES[d][k])
+    return roll[::-1]
+
+def roll_from_mask(mask):
+    # Tirage de la vraie table correspondant à un masque, ou None (les faces
+    # des dés sont disjointes : chaque dé a exactement une case dans le masque)
+    roll = []
+    for faces in FACES:
+        hit = [face for face in faces if mask >> to_cell(face) & 1]
+        if len(hit) != 1:
+            return None
+        roll.append(hit[0])
+    return roll if blockers_mask(roll) == mask else None
@@ -0,0 +1,95 @@
+import sys
+import json
+from fractions import Fraction
+from collections import Counter
+
+import dice
+from pieces import to_cell, blockers_mask
+from symmetry import canonical
+
+# --- Loi exacte des tirages ---
+# Les dés ont des faces répétées (A6 x3 / F1 x3, A5 x2 / F2 x2) : les
+# tirages ne sont pas équiprobables. On combine dé par dé le nombre de
+# faces menant à chaque case, sans échantillonner : le poids d'un masque
+# est son nombre de façons de sortir sur 6^7 jets, sa probabilité
+# poids / TOTAL (exacte, en Fraction).
+
+TOTAL = 6 ** len(dice.DES)
+
+_weights = None
+
+def weights(table=None):
+    # Masque des cases bloquées -> nombre de jets (sur 6^nombre de dés)
+    global _weights
+    if table is None and _weights is not None:
+        return _weights
+    result = {0: 1}
+    for de in dice.DES if table is None else table:
+        counts = Counter(1 << to_cell(face) for face in de)
+        step = {}
+        for mask, w in result.items():
+            for bit, count in counts.items():
+                step[mask | bit] = step.get(mask | bit, 0) + w * count
+        result = step
+    if table is None:
+        _weights = result
+    return result
+
+def distribution(table=None):
+    # Masque -> probabilité exacte
+    w = weights(table)
+    total = sum(w.values())
+    return {mask: Fraction(n, total) for mask, n in w.items()}
+
+def probability(roll):
+    # roll : masque ou liste de cases ("B3" ou [r, c])
+    mask = roll if isinstance(roll, int) else blockers_mask(roll)
+    return Fraction(weights().get(mask, 0), TOTAL)
+
+def class_weights():
+    # Classe de symétrie (masque canonique) -> somme des poids de ses tirages
+    result = {}
+    for mask, w in weights().items():
+        canon = canonical(mask)[0]
+        result[canon] = result.get(canon, 0) + w
+    return result
+
+def expectation(f):
+    # Espérance exacte de f(masque) sur la loi des dés
+    return sum(Fraction(w, TOTAL) * f(mask) for mask, w in weights().items())
+
+def weighted_sweep(path):
+    # Statistiques d'un fichier de sweep.py, pondérées par la loi des dés
+    # et, pour comparer, comme si tous les tirages distincts étaient égaux
+    w = weights()
+    seen = solvable = nodes = 0
+    p_seen = p_solvable = p_nodes = Fraction(0)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            result = json.loads(line)
+            p = Fraction(w[blockers_mask(result["dice"])], TOTAL)
+            seen += 1
+            p_seen += p
+            nodes += result["nodes"]
+            p_nodes += p * result["nodes"]
+            if result["solvable"]:
+                solvable += 1
+                p_solvable += p
+    return {
+        "rolls": seen,
+        "coverage": float(p_seen),
+        "solvable_uniform": solvable / seen if seen else 0.0,
+        "solvable_weighted": float(p_solvable / p_seen) if p_seen else 0.0,
+        "nodes_uniform": nodes / seen if seen else 0.0,
+        "nodes_weighted": float(p_nodes / p_seen) if p_seen else 0.0,
+    }
+
+if __name__ == "__main__":
+    w = weights()
+    levels = Counter(w.values())
+    print(f"{len(w)} tirages distincts, {len(class_weights())} classes de symétrie, total {sum(w.values())} = 6^{len(dice.DES)}")
+    for n, count in sorted(levels.items()):
+        print(f"  p = {Fraction(n, TOTAL)} : {count} tirages")
+    if len(sys.argv) > 1:
+        for key, value in weighted_sweep(sys.argv[1]).items():
+            print(f"{key:18} {value}")
@@ -0,0 +1,172 @@
+from pieces import SIZES, CELLS, mask_coords
+from placements import PLACEMENTS
+from bitboard import tracer
+
+# --- Solver Dancing Links (Algorithm X de Knuth) ---
+# Colonnes : une par pièce restante et une par case libre, toutes primaires,
+# donc le MRV choisit aussi bien une case difficile à remplir qu'une pièce.
+# Le plateau n'a pas besoin d'être rempli : chaque case a une ligne "reste
+# vide" (filler), utilisable au plus `slack` fois, slack = cases libres moins
+# taille des pièces. Quand les pièces remplissent exactement les cases
+# (7 pièces avec les vrais dés), slack = 0 : c'est un exact cover pur.
+
+class DancingLinks:
+    def __init__(self, blocked, remaining, trace=None):
+        self.remaining = list(remaining)
+        self.trace = trace
+        npieces = len(self.remaining)
+        ncols = npieces + CELLS
+        # Noeud 0 : racine, 1..ncols : en-têtes de colonnes
+        self.L = list(range(-1, ncols))
+        self.R = list(range(1, ncols + 2))
+        self.L[0] = ncols
+        self.R[ncols] = 0
+        self.U = list(range(ncols + 1))
+        self.D = list(range(ncols + 1))
+        self.C = list(range(ncols + 1))
+        self.S = [0] * (ncols + 1)
+        self.rows = [None] * (ncols + 1)
+        self.occupied = blocked
+        self.npieces = npieces
+        free = CELLS - bin(blocked).count("1")
+        self.slack = free - sum(SIZES[p] for p in self.remaining)
+        self.holes = 0
+        # Les cases bloquées sortent de la liste de la racine
+        for i in range(CELLS):
+            if blocked >> i & 1:
+                c = npieces + 1 + i
+                self.R[self.L[c]] = self.R[c]
+                self.L[self.R[c]] = self.L[c]
+                self.L[c] = self.R[c] = c
+
+        for k, piece in enumerate(self.remaining):
+            for m in PLACEMENTS[piece]:
+                if not blocked & m:
+                    cols = [k + 1] + [npieces + 1 + i for i in range(CELLS) if m >> i & 1]
+                    self._add_row(cols, (piece, m))
+        if self.slack:
+            for i in range(CELLS):
+                if not blocked >> i & 1:
+                    self._add_row([npieces + 1 + i], (None, 1 << i))
+
+    def _add_row(self, cols, row):
+        first = len(self.C)
+        for j, c in enumerate(cols):
+            n = first + j
+            self.C.append(c)
+            self.rows.append(row)
+            self.U.append(self.U[c])
+            self.D.append(c)
+            self.D[self.U[c]] = n
+            self.U[c] = n
+            self.L.append(n - 1 if j else first + len(cols) - 1)
+            self.R.append(n + 1 if j < len(cols) - 1 else first)
+            self.S[c] += 1
+
+    def _cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def _full(self):
+        # Plus de case vide autorisée : les fillers ne comptent plus
+        return self.slack and self.holes >= self.slack
+
+    def _choose(self):
+        # Colonne la plus contrainte (minimum remaining values)
+        R, S, npieces = self.R, self.S, self.npieces
+        full = self._full()
+        c, size = 0, None
+        j = R[0]
+        while j != 0:
+            s = S[j] - 1 if full and j > npieces else S[j]
+            if size is None or s < size:
+                c, size = j, s
+                if s == 0:
+                    break
+            j = R[j]
+        return c, size
+
+    def search(self, solution):
+        R, D, trace = self.R, self.D, self.trace
+        if trace is not None:
+            trace.node(len(solution), self.occupied)
+        if R[0] == 0:
+            return True
+        c, size = self._choose()
+        if size == 0:
+            if trace is not None:
+                trace.prunes += 1
+            return False
+        self._cover(c)
+        r = D[c]
+        while r != c:
+            piece, m = self.rows[r]
+            if piece is None:
+                if self._full():
+                    r = D[r]
+                    continue
+                self.holes += 1
+            solution.append(r)
+            self.occupied |= m
+            j = R[r]
+            while j != r:
+                self._cover(self.C[j])
+                j = R[j]
+            if self.search(solution):
+                return True
+            solution.pop()
+            self.occupied ^= m
+            if piece is None:
+                self.holes -= 1
+            if trace is not None:
+                trace.backtracks += 1
+            j = self.L[r]
+            while j != r:
+                self._uncover(self.C[j])
+                j = self.L[j]
+            r = D[r]
+        self._uncover(c)
+        return False
+
+def solve(blocked, remaining, stats=None, progress=None):
+    free = CELLS - bin(blocked).count("1")
+    if sum(SIZES[p] for p in remaining) > free:
+        if stats is not None:
+            stats.prune("size")
+        return None
+    trace = tracer(stats, progress)
+    links = DancingLinks(blocked, remaining, trace)
+    solution = []
+    try:
+        found = links.search(solution)
+    finally:
+        if trace is not None:
+            trace.record("empty-column")
+    if not found:
+        return None
+    return {piece: mask_coords(m) for piece, m in (links.rows[r] for r in solution)
+            if piece is not None}
@@ -0,0 +1,277 @@
+import os
+import json
+import math
+import struct
+from itertools import islice
+
+from logparse import parse_line
+
+# --- Lecture de games.log ---
+# Une partie par ligne JSON. Tout se lit en flux, par blocs de CHUNK
+# octets : la mémoire ne dépend pas de la taille du fichier. Une partie se
+# relit en se plaçant à son décalage en octets (seek), la dernière en
+# remontant depuis la fin du fichier.
+
+LOG_FILE = "games.log"
+CHUNK = 1 << 16
+
+def iter_lines(path=LOG_FILE, start=0):
+    # (décalage, ligne brute en bytes) pour chaque ligne non vide
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+def iter_games(path=LOG_FILE):
+    # Parties décodées ; les lignes illisibles (écriture coupée...) sont sautées
+    for _, line in iter_lines(path):
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+def iter_offsets(path=LOG_FILE):
+    # Décalage de début de chaque ligne non vide, en cherchant les \n par blocs
+    with open(path, "rb") as f:
+        pos = 0
+        start = 0
+        blank = True
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            i = 0
+            while True:
+                j = chunk.find(b"\n", i)
+                end = len(chunk) if j < 0 else j
+                if blank and chunk[i:end].strip():
+                    blank = False
+                    yield start
+                if j < 0:
+                    break
+                i = j + 1
+                start = pos + i
+                blank = True
+            pos += len(chunk)
+
+def count_games(path=LOG_FILE):
+    return sum(1 for _ in iter_offsets(path))
+
+def read_at(path, offset):
+    # Partie qui commence au décalage `offset`
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+def game(path, n):
+    # Partie n (0 = première, -1 = dernière, IndexError si elle n'existe pas)
+    if n == -1:
+        found = last_game(path)
+        if found is None:
+            raise IndexError("games.log vide")
+        return found
+    if n < 0:
+        n += count_games(path)
+    offset = next(islice(iter_offsets(path), n, None), None) if n >= 0 else None
+    if offset is None:
+        raise IndexError(f"pas de partie {n}")
+    return read_at(path, offset)
+
+def last_offset(path=LOG_FILE):
+    # Début de la dernière ligne non vide, en lisant le fichier à l'envers
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        # Saute les fins de ligne et blancs finaux
+        while end > 0:
+            f.seek(max(0, end - CHUNK))
+            block = f.read(end - max(0, end - CHUNK))
+            stripped = block.rstrip()
+            end -= len(block) - len(stripped)
+            if stripped:
+                break
+        if end == 0:
+            return None
+        pos = end
+        while pos > 0:
+            size = min(CHUNK, pos)
+            f.seek(pos - size)
+            block = f.read(size)
+            i = block.rfind(b"\n")
+            if i >= 0:
+                return pos - size + i + 1
+            pos -= size
+        return 0
+
+def last_game(path=LOG_FILE):
+    offset = last_offset(path)
+    return None if offset is None else read_at(path, offset)
+
+# --- Index des parties : games.log.idx ---
+# Fichier à côté du log, un enregistrement de taille fixe par ligne non vide
+# (numéro de partie = position dans l'index, comme pour game()) :
+#   décalage (Q), date de fin de partie (d, NaN si inconnue), joueur (32s)
+# L'en-tête garde la taille et la date de modification du log indexé :
+# si le log a grandi, seules les nouvelles lignes sont indexées ; s'il a
+# changé autrement, l'index est reconstruit. Seules les lignes complètes
+# (terminées par \n) sont indexées.
+#   en-tête : b"GSQI", version (B), taille du log (Q), mtime du log en ns (q),
+#             fin de la dernière ligne indexée (Q), nombre d'enregistrements (Q)
+
+INDEX_MAGIC = b"GSQI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sBQqQQ")
+INDEX_RECORD = struct.Struct("<Qd32s")
+
+def stored_name(raw):
+    # Joueur tel que relu dans l'index (32 octets au plus, coupés n'importe où)
+    return raw.rstrip(b"\0").decode("utf-8", "replace")
+
+def index_record(offset, line):
+    # Lu avec logparse : les trois schémas du log, orjson s'il est là
+    game = parse_line(line)
+    player, when = "", math.nan
+    if game is not None:
+        player = game.player
+        end = game.end_time()
+        if isinstance(end, (int, float)):
+            when = float(end)
+    return INDEX_RECORD.pack(offset, when, player.encode("utf-8")[:32])
+
+class GameIndex:
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.count = 0
+        self.refresh()
+
+    def __len__(self):
+        return self.count
+
+    def _read_header(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, version, size, mtime, end, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        except (OSError, struct.error):
+            return None
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return None
+        if os.path.getsize(self.index_path) < INDEX_HEADER.size + count * INDEX_RECORD.size:
+            return None
+        return size, mtime, end, count
+
+    def refresh(self):
+        # Met l'index à jour avec le log (rien à faire s'il n'a pas changé)
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is None:
+            # Pas de log : index vide, sans rien écrire sur le disque
+            self.count = 0
+            return self
+        header = self._read_header()
+        if header is not None:
+            size, mtime, end, count = header
+            if st.st_size == size and st.st_mtime_ns == mtime:
+                self.count = count
+                return self
+            if st.st_size > size and self._same_prefix(end):
+                self.count = count
+                self._scan(end, st, append=True)
+                return self
+        self.count = 0
+        self._scan(0, st, append=False)
+        return self
+
+    def _same_prefix(self, end):
+        # Le log a seulement grandi si la dernière ligne indexée finit toujours à `end`
+        if end == 0:
+            return True
+        with open(self.path, "rb") as f:
+            f.seek(end - 1)
+            return f.read(1) == b"\n"
+
+    def _scan(self, start, st, append):
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            end = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    records.append(index_record(end, line))
+                end += len(line)
+        self._write(records, st.st_size, st.st_mtime_ns, end, append)
+
+    def _write(self, records, size, mtime, end, append):
+        count = self.count + len(records) if append else len(records)
+        if append:
+            with open(self.index_path, "r+b") as f:
+                f.seek(INDEX_HEADER.size + self.count * INDEX_RECORD.size)
+                f.write(b"".join(records))
+                f.truncate()
+                # En-tête en dernier : un arrêt brutal laisse un index périmé, pas faux
+                f.seek(0)
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, size, mtime, end, count))
+        else:
+            tmp = "%s.%d.tmp" % (self.index_path, os.getpid())
+            with open(tmp, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, size, mtime, end, count))
+                f.write(b"".join(records))
+            os.replace(tmp, self.index_path)
+        self.count = count
+
+    def records(self):
+        # (numéro, décalage, date, joueur) pour chaque partie indexée
+        if not self.count:
+            return
+        per_chunk = CHUNK // INDEX_RECORD.size
+        with open(self.index_path, "rb") as f:
+            f.seek(INDEX_HEADER.size)
+            for first in range(0, self.count, per_chunk):
+                body = f.read(min(per_chunk, self.count - first) * INDEX_RECORD.size)
+                for n, (offset, when, player) in enumerate(INDEX_RECORD.iter_unpack(body), first):
+                    yield n, offset, when, stored_name(player)
+
+    def offset(self, n):
+        if n < 0:
+            n += self.count
+        if not 0 <= n < self.count:
+            raise IndexError(f"pas de partie {n}")
+        with open(self.index_path, "rb") as f:
+            f.seek(INDEX_HEADER.size + n * INDEX_RECORD.size)
+            return INDEX_RECORD.unpack(f.read(INDEX_RECORD.size))[0]
+
+    def game(self, n):
+        return read_at(self.path, self.offset(n))
+
+    def record(self, n):
+        # Partie n en logparse.Game (None si la ligne est illisible)
+        with open(self.path, "rb") as f:
+            f.seek(self.offset(n))
+            return parse_line(f.readline())
+
+    def last(self):
+        return self.game(-1) if self.count else None
+
+    def by_player(self, player):
+        # Numéros des parties du joueur (noms de plus de 32 octets : vérifiés dans le log)
+        key = stored_name(player.encode("utf-8")[:32])
+        found = [n for n, _, _, name in self.records() if name == key]
+        if len(player.encode("utf-8")) >= 32:
+            found = [n for n in found if self.game(n).get("player") == player]
+        return found
+
+    def between(self, start=None, end=None):
+        # Numéros des parties finies dans [start, end[ (secondes epoch ou datetime)
+        start = -math.inf if start is None else start.timestamp() if hasattr(start, "timestamp") else start
+        end = math.inf if end is None else end.timestamp() if hasattr(end, "timestamp") else end
+        return [n for n, _, when, _ in self.records() if start <= when < end]
+
+    def games(self, numbers):
+        for n in numbers:
+            yield self.game(n)
@@ -17,10 +17,12 @@ import tkinter as tk
 from tkinter import messagebox
 import time
 import json
-import random
 import configparser
 import os
 
+import dice
+import logwriter
+
 GRID_SIZE = 6
 PIECES = ['A', 'B', 'C', 'D', 'E', 'F']
 COORDS = [f"{row}{col}" for row in "ABCDEF" for col in "123456"]
@@ -163,7 +165,7 @@ class PuzzleGame:
         self.timer_id = self.root.after(1000, self.update_timer)
 
     def roll_dice(self):
-        return random.sample(COORDS, 6)
+        return dice.roll_names("sample6")
 
     def save_game(self):
         duration = int(time.time() - self.start_time)
@@ -173,8 +175,7 @@ class PuzzleGame:
             "moves": self.moves,
             "duration": duration
         }
-        with open("games.log", "a") as f:
-            f.write(json.dumps(log) + "\n")
+        logwriter.log_game(log, "games.log")
         messagebox.showinfo("Partie terminée", f"Bravo {self.player_name} ! Temps: {duration}s")
 
     def solve(self):
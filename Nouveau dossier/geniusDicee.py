@@ -1,72 +1,26 @@
 import tkinter as tk
-import json
 import time
 import random
 import os
 import configparser
 from tkinter import messagebox
 
-GRID_SIZE = 6
-
-# --- Solver intégré ---
-
-PIECES = {
-    'L': [(0,0),(1,0),(2,0),(2,1)],
-    'N': [(0,1),(1,1),(1,0),(2,0)],
-    'T': [(0,0),(0,1),(0,2),(1,1)],
-    'U': [(0,0),(0,2),(1,0),(1,1),(1,2)],
-    'V': [(0,0),(1,0),(2,0),(2,1)],
-    'W': [(0,0),(1,0),(1,1),(2,1)],
-    'X': [(0,1),(1,0),(1,1),(1,2),(2,1)],
-    'Y': [(0,1),(1,1),(2,1),(3,1),(3,0)],
-    'Z': [(0,0),(0,1),(1,1),(1,2)]
-}
-
-def all_orientations(shape):
-    shapes = set()
-    coords = shape
-    for flip in (False, True):
-        for rot in range(4):
-            pts = coords
-            if flip:
-                pts = [(-x,y) for x,y in pts]
-            for _ in range(rot):
-                pts = [(y, -x) for x,y in pts]
-            minx = min(x for x,y in pts)
-            miny = min(y for x,y in pts)
-            norm = tuple(sorted(((x - minx, y - miny) for x,y in pts)))
-            shapes.add(norm)
-    return shapes
-
-ALL_PIECES = {k: list(all_orientations(v)) for k,v in PIECES.items()}
-
-def solve(board, remaining, placement=None):
-    if placement is None:
-        placement = {}
-    if not remaining:
-        return placement
-    piece = remaining[0]
-    for orient in ALL_PIECES[piece]:
-        max_x = max(x for x,y in orient)
-        max_y = max(y for x,y in orient)
-        for i in range(GRID_SIZE - max_x):
-            for j in range(GRID_SIZE - max_y):
-                coords = [(i + x, j + y) for x,y in orient]
-                if all(board[x][y] == '' for x,y in coords):
-                    for x,y in coords:
-                        board[x][y] = piece
-                    placement[piece] = coords
-                    sol = solve(board, remaining[1:], placement)
-                    if sol is not None:
-                        return sol
-                    for x,y in coords:
-                        board[x][y] = ''
-                    del placement[piece]
-    return None
+from pieces import GRID_SIZE, PIECES, ALL_PIECES
+from pieces import board_mask, blockers_mask, fitting_pieces, CELL_COORDS
+from solver import DEFAULT_BACKEND
+from cache import SolutionCache
+from background import BackgroundSolver
+from hint import HintEngine
+from rolldb import open_db
+import gamelog
+import logwriter
+import dice
 
 # --- Jeu principal ---
 
 ALL_BLOCKS = list(PIECES.keys())
+# Comptage des solutions d'un tirage arrêté à COUNT_CAP (affiché "1000+")
+COUNT_CAP = 1000
 
 class GeniusSquare:
     def __init__(self, root):
@@ -75,7 +29,7 @@ class GeniusSquare:
 
         # Interface
         self.canvas = tk.Canvas(root, width=600, height=600, bg='white')
-        self.canvas.grid(row=0, column=1, rowspan=8, padx=10, pady=10)
+        self.canvas.grid(row=0, column=1, rowspan=10, padx=10, pady=10)
 
         tk.Button(root, text="Nouvelle partie", command=self.new_game).grid(row=0, column=0, sticky="ew", padx=5, pady=5)
         tk.Button(root, text="Undo (Ctrl+Z)", command=self.undo).grid(row=1, column=0, sticky="ew", padx=5, pady=5)
@@ -88,6 +42,13 @@ class GeniusSquare:
         self.roll_label.grid(row=5, column=0, sticky="w", padx=5, pady=5)
         self.player_label = tk.Label(root, text="Joueur: ")
         self.player_label.grid(row=6, column=0, sticky="w", padx=5, pady=5)
+        self.cancel_button = tk.Button(root, text="Annuler le solver", command=self.cancel_solver, state="disabled")
+        self.cancel_button.grid(row=7, column=0, sticky="ew", padx=5, pady=5)
+        self.solver_label = tk.Label(root, text="Solver : -")
+        self.solver_label.grid(row=8, column=0, sticky="w", padx=5, pady=5)
+        tk.Button(root, text="Indice", command=self.hint).grid(row=9, column=0, sticky="ew", padx=5, pady=5)
+        self.count_label = tk.Label(root, text="Solutions : -")
+        self.count_label.grid(row=10, column=0, sticky="w", padx=5, pady=5)
 
         # Bindings
         self.root.bind("<Control-z>", lambda e: self.undo())
@@ -103,6 +64,14 @@ class GeniusSquare:
         self._ensure_settings()
         self._load_settings()
 
+        # Solutions déjà calculées (mémoire + disque)
+        self.cache = SolutionCache()
+        # Le solver tourne hors de la boucle Tk
+        self.solver = BackgroundSolver(self.root, self.solver_done, self.solver_progress, timeout=self.solver_timeout)
+        self.pending_solve = None
+        self.counter = BackgroundSolver(self.root, self.count_done, timeout=self.solver_timeout)
+        self.hints = HintEngine(self.cache, db=open_db())
+
         self.cell_size = 100
         self.board = [['' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
 
@@ -134,6 +103,13 @@ class GeniusSquare:
         else:
             self.colors = {b: "#CCCCCC" for b in ALL_BLOCKS}
 
+        # Moteur du solver (voir solver.BACKENDS : "bitboard", "cells", "dlx"...)
+        self.solver_backend = cfg.get("Solver", "backend", fallback=DEFAULT_BACKEND)
+        self.solver_timeout = cfg.getfloat("Solver", "timeout", fallback=30.0)
+
+        # Modèle de dés (voir dice.py : "real", "sample6"...)
+        self.dice_variant = cfg.get("Dice", "variant", fallback="sample6")
+
     def draw_grid(self):
         self.cells = {}
         self.canvas.delete("all")
@@ -147,18 +123,25 @@ class GeniusSquare:
                 self.cells[(i,j)] = cid
 
     def new_game(self):
+        if self.solver.running:
+            self.solver.cancel()
         self.draw_grid()
         self.board = [['' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
         self.placed.clear()
         self.moves.clear()
 
-        # Tirage aléatoire des 6 dés (cases noires)
-        self.roll = random.sample([(i,j) for i in range(GRID_SIZE) for j in range(GRID_SIZE)], 6)
+        # Tirage aléatoire des dés (cases noires)
+        self.roll = dice.roll_cells(self.dice_variant)
         for i,j in self.roll:
             self.board[i][j] = "#"
             self.canvas.itemconfig(self.cells[(i,j)], fill="black")
 
         self.roll_label.config(text="Dés: " + str(self.roll))
+        # Les 9 pièces ne tiennent jamais : comptage et indices portent sur
+        # celles qui tiennent
+        self.target = fitting_pieces(blockers_mask(self.roll), ALL_BLOCKS)
+        self.count_label.config(text="Solutions : calcul...")
+        self.counter.count(blockers_mask(self.roll), self.target, COUNT_CAP)
         self.start_time = time.time()
         self.timer_running = True
         self.update_timer()
@@ -228,8 +211,7 @@ class GeniusSquare:
             "moves": [{"piece": b, "position": p, "timestamp": t} for b, p, t in self.moves],
             "duration": duration
         }
-        with open("games.log", "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        logwriter.log_game(log_entry, "games.log")
 
     def undo(self):
         if not self.moves:
@@ -244,9 +226,70 @@ class GeniusSquare:
             self.try_place(b, p)
 
     def give_up(self):
+        if self.solver.running:
+            # Une recherche est déjà en cours (bouton Annuler pour l'arrêter)
+            return
         board = [['' if self.board[i][j] != "#" else "#" for j in range(GRID_SIZE)] for i in range(GRID_SIZE)]
         remaining = [b for b in ALL_BLOCKS if b not in self.placed]
-        sol = solve(board, remaining)
+        found, sol = self.cache.lookup(board, remaining)
+        if found:
+            self.show_solution(sol)
+            return
+        self.pending_solve = (board, remaining)
+        self.cancel_button.config(state="normal")
+        self.solver_label.config(text="Solver : recherche...")
+        self.solver.start(board_mask(board), remaining, backend=self.solver_backend)
+
+    def cancel_solver(self):
+        self.solver.cancel()
+
+    def solver_progress(self, nodes):
+        self.solver_label.config(text=f"Solver : {nodes} noeuds")
+
+    def solver_done(self, status, sol):
+        self.cancel_button.config(state="disabled")
+        if status == "done":
+            board, remaining = self.pending_solve
+            self.cache.store(board, remaining, sol)
+            self.solver_label.config(text="Solver : terminé")
+            self.show_solution(sol)
+        elif status == "timeout":
+            self.solver_label.config(text="Solver : délai dépassé")
+            messagebox.showinfo("Solver", f"Pas de solution en {self.solver_timeout:g} secondes.")
+        elif status == "cancelled":
+            self.solver_label.config(text="Solver : annulé")
+        else:
+            self.solver_label.config(text="Solver : erreur")
+            messagebox.showerror("Solver", sol)
+        self.pending_solve = None
+
+    def count_done(self, status, total):
+        # Nombre de solutions du tirage (tout de suite ou depuis l'arrière-plan)
+        if status == "done":
+            self.count_label.config(text=f"Solutions {''.join(self.target)} : {total}" + ("+" if total >= COUNT_CAP else ""))
+        elif status == "timeout":
+            self.count_label.config(text=f"Solutions : > {self.solver_timeout:g} s")
+        elif status == "error":
+            self.count_label.config(text="Solutions : erreur")
+
+    def hint(self):
+        # Un placement compatible avec une solution complète, affiché 2 secondes
+        blocked = board_mask([['#' if c == '#' else '' for c in row] for row in self.board])
+        placed = {p: [(i, j) for i in range(GRID_SIZE) for j in range(GRID_SIZE) if self.board[i][j] == p] for p in self.placed}
+        result = self.hints.hint(blocked, placed, self.target)
+        latency = self.hints.last_latency * 1000
+        if result is None:
+            self.solver_label.config(text=f"Indice : aucun ({latency:.2f} ms)")
+            return
+        piece, coords = result
+        self.solver_label.config(text=f"Indice : {piece} ({latency:.2f} ms)")
+        for i, j in coords:
+            x1, y1 = j * self.cell_size, i * self.cell_size
+            self.canvas.create_rectangle(x1, y1, x1 + self.cell_size, y1 + self.cell_size,
+                                         fill=self.colors[piece], stipple="gray50", tags="hint")
+        self.root.after(2000, lambda: self.canvas.delete("hint"))
+
+    def show_solution(self, sol):
         if sol is None:
             messagebox.showinfo("Solver", "Pas de solution trouvée. Vous pouvez retirer une pièce et réessayer.")
             return
@@ -259,21 +302,32 @@ class GeniusSquare:
         if not os.path.exists("games.log"):
             messagebox.showerror("Replay", "Fichier games.log introuvable.")
             return
-        with open("games.log", encoding="utf-8") as f:
-            lines = f.readlines()
-        if not lines:
+        logwriter.flush()
+        index = gamelog.GameIndex("games.log")
+        if not len(index):
             messagebox.showinfo("Replay", "Aucune partie enregistrée.")
             return
-        replay = json.loads(lines[-1])
+        # Dernière partie de ce jeu : "position" est le coin haut-gauche de
+        # la première orientation (ALL_PIECES[p][0]). Celles de zzzzz ("pos")
+        # sont ancrées sur les offsets bruts de ses pièces, celles de
+        # geniusDice2 ("coord") se jouent case par case
+        replay = None
+        for n in range(len(index) - 1, -1, -1):
+            game = index.record(n)
+            if game is not None and game.schema == "position":
+                replay = game
+                break
+        if replay is None:
+            messagebox.showinfo("Replay", "Aucune partie rejouable : les parties enregistrées sont illisibles ou d'un autre jeu.")
+            return
         self.draw_grid()
-        for i,j in replay["dice"]:
+        for i,j in replay.dice_coords():
             self.canvas.itemconfig(self.cells[(i,j)], fill="black")
-        for move in replay["moves"]:
-            piece = move["piece"]
-            x,y = move["position"]
-            for xx, yy in ALL_PIECES[piece][0]:
-                self.canvas.itemconfig(self.cells[(x+xx, y+yy)], fill=self.colors.get(piece, "#CCCCCC"))
-        messagebox.showinfo("Replay", f"Rejeu de {replay['player']} en {replay['duration']} secondes.")
+        for move in replay.moves():
+            x,y = CELL_COORDS[move.cell]
+            for xx, yy in ALL_PIECES[move.piece][0]:
+                self.canvas.itemconfig(self.cells[(x+xx, y+yy)], fill=self.colors.get(move.piece, "#CCCCCC"))
+        messagebox.showinfo("Replay", f"Rejeu de {replay.player} en {replay.duration} secondes.")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,129 @@
+import sys
+import json
+import time
+import argparse
+from multiprocessing import Pool
+
+from pieces import PIECES, GRID_SIZE, LETTERS, CELL_COORDS, coord_name, to_cell
+from solver import solve, BACKENDS, DEFAULT_BACKEND
+from cache import SolutionCache
+from symmetry import canonical, from_canonical
+
+# --- Solveur en ligne de commande, sans Tk ---
+# Lit des tirages en JSONL sur l'entrée standard et écrit une ligne JSON de
+# résultat par tirage sur la sortie standard. Une ligne d'entrée peut être :
+#   ["B3", "D6", ...]                      liste de cases
+#   [[1, 2], [3, 5], ...]                  liste de [r, c]
+#   {"dice_roll": [...], ...}              ligne de games.log
+#   {"dice": [...], "pieces": "LNTUV", "id": ...}
+# Exemple : python headless.py -p LNTUV -w 4 < games.log > solutions.jsonl
+# Chaque processus garde un cache mémoire par classe de symétrie : les
+# tirages déjà vus ne sont pas recherchés une deuxième fois. La recherche
+# se fait toujours sur le masque canonique, donc la solution d'un tirage ne
+# dépend ni du nombre de processus ni de l'ordre des lignes.
+
+FLUSH_EVERY = 1000
+
+_cache = None
+_backend = DEFAULT_BACKEND
+_pieces = list(PIECES)
+
+def init_worker(backend, pieces, capacity):
+    global _cache, _backend, _pieces
+    _cache = SolutionCache(capacity=capacity, path=None)
+    _backend = backend
+    _pieces = list(pieces)
+
+def parse_roll(text):
+    # (cases bloquées, pièces, id) depuis une ligne d'entrée
+    data = json.loads(text)
+    pieces, ident = _pieces, None
+    if isinstance(data, dict):
+        ident = data.get("id")
+        if data.get("pieces"):
+            pieces = list(data["pieces"])
+        data = data.get("dice", data.get("dice_roll"))
+    if not isinstance(data, list) or not data:
+        raise ValueError("tirage attendu : liste de cases ou objet avec 'dice' / 'dice_roll'")
+    unknown = [p for p in pieces if p not in PIECES]
+    if unknown:
+        raise ValueError(f"pièces inconnues : {''.join(unknown)}")
+    cells = set()
+    for cell in data:
+        if isinstance(cell, str):
+            if len(cell) != 2 or cell[0].upper() not in LETTERS or cell[1] not in "123456":
+                raise ValueError(f"case inconnue : {cell}")
+        elif len(cell) != 2 or not all(isinstance(x, int) and 0 <= x < GRID_SIZE for x in cell):
+            raise ValueError(f"case hors du plateau : {cell}")
+        cells.add(to_cell(cell))
+    return sorted(cells), pieces, ident
+
+def solve_line(job):
+    # Renvoie la ligne de sortie déjà encodée (moins à transmettre entre processus)
+    number, text = job
+    result = {"line": number}
+    start = time.perf_counter()
+    try:
+        cells, pieces, ident = parse_roll(text)
+    except (ValueError, TypeError, KeyError, IndexError) as e:
+        result["error"] = str(e)
+        return json.dumps(result)
+    if ident is not None:
+        result["id"] = ident
+    blocked = 0
+    for i in cells:
+        blocked |= 1 << i
+    canon, t = canonical(blocked)
+    found, sol = _cache.get(canon, pieces)
+    if not found:
+        sol = solve(canon, pieces, backend=_backend)
+        _cache.put(canon, pieces, sol)
+    sol = from_canonical(sol, t)
+    result["dice"] = [coord_name(*CELL_COORDS[i]) for i in cells]
+    result["solvable"] = sol is not None
+    result["solution"] = None if sol is None else {p: [coord_name(r, c) for r, c in coords] for p, coords in sol.items()}
+    result["time"] = time.perf_counter() - start
+    return json.dumps(result)
+
+def read_jobs(stream):
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+def run(stream, out, backend=DEFAULT_BACKEND, pieces=None, workers=1, ordered=True, chunksize=256, capacity=65536):
+    pieces = list(PIECES) if pieces is None else list(pieces)
+    jobs = read_jobs(stream)
+    count = 0
+    start = time.perf_counter()
+    if workers <= 1:
+        init_worker(backend, pieces, capacity)
+        results = map(solve_line, jobs)
+        pool = None
+    else:
+        pool = Pool(workers, initializer=init_worker, initargs=(backend, pieces, capacity))
+        results = (pool.imap if ordered else pool.imap_unordered)(solve_line, jobs, chunksize)
+    try:
+        for line in results:
+            out.write(line + "\n")
+            count += 1
+            if count % FLUSH_EVERY == 0:
+                out.flush()
+    finally:
+        out.flush()
+        if pool is not None:
+            pool.terminate()
+    return count, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Résout des tirages lus en JSONL sur l'entrée standard.")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="nombre de processus (1 : pas de pool)")
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("-p", "--pieces", default="".join(PIECES), help="pièces à placer par défaut, ex. LNTUV")
+    parser.add_argument("--unordered", action="store_true", help="écrire les résultats dès qu'ils sont prêts (champ 'line' pour l'ordre)")
+    parser.add_argument("--chunksize", type=int, default=256)
+    parser.add_argument("--cache", type=int, default=65536, help="tirages gardés en cache par processus")
+    args = parser.parse_args()
+    count, elapsed = run(sys.stdin, sys.stdout, args.backend, list(args.pieces), args.workers,
+                         not args.unordered, args.chunksize, args.cache)
+    print(f"{count} tirages en {elapsed:.2f} s ({count / elapsed if elapsed else 0:.0f}/s)", file=sys.stderr)
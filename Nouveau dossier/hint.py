@@ -0,0 +1,78 @@
+import time
+
+from pieces import PIECES, coords_mask, mask_coords
+from cache import SolutionCache
+
+# --- Indices ---
+# Un indice est un placement d'une pièce restante tiré d'une solution
+# complète compatible avec les pièces déjà posées. Il vient toujours d'une
+# solution déjà connue : témoin de l'oracle, base de solutions de rolldb.py,
+# cache du tirage complet, cache de la position. Aucune recherche n'est
+# lancée (l'appel se fait dans la boucle Tk) : si rien n'est connu, pas
+# d'indice.
+
+class HintEngine:
+    def __init__(self, cache=None, db=None):
+        self.cache = SolutionCache() if cache is None else cache
+        self.db = db
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.count = 0
+        self.sources = {"witness": 0, "database": 0, "roll": 0, "position": 0, "none": 0}
+
+    def hint(self, blocked, placed, pieces=None, witness=None):
+        # blocked : masque des dés ; placed : {pièce: coords} déjà posées ;
+        # witness : {pièce: masque} optionnel (ex. SolvabilityOracle.witness)
+        start = time.perf_counter()
+        source, result = self._find(blocked, placed, list(PIECES) if pieces is None else list(pieces), witness)
+        elapsed = time.perf_counter() - start
+        self.last_latency = elapsed
+        self.total_latency += elapsed
+        self.max_latency = max(self.max_latency, elapsed)
+        self.count += 1
+        self.sources[source] += 1
+        return result
+
+    def _find(self, blocked, placed, pieces, witness):
+        remaining = [p for p in pieces if p not in placed]
+        if not remaining:
+            return "none", None
+        placed_masks = {p: coords_mask(coords) for p, coords in placed.items()}
+        occupied = blocked
+        for m in placed_masks.values():
+            occupied |= m
+
+        if witness and all(p in witness for p in remaining):
+            used = occupied
+            for p in remaining:
+                if used & witness[p]:
+                    break
+                used |= witness[p]
+            else:
+                p = remaining[0]
+                return "witness", (p, mask_coords(witness[p]))
+
+        # Solution du tirage complet : utilisable si elle passe par les pièces posées
+        for source, known in (("database", self.db), ("roll", self.cache)):
+            if known is None:
+                continue
+            found, sol = known.lookup(blocked, pieces)
+            if found and sol is not None and all(coords_mask(sol[p]) == m for p, m in placed_masks.items()):
+                p = remaining[0]
+                return source, (p, sol[p])
+
+        found, sol = self.cache.lookup(occupied, remaining)
+        if not found or sol is None:
+            return "none", None
+        p = remaining[0]
+        return "position", (p, sol[p])
+
+    def latency_stats(self):
+        return {
+            "count": self.count,
+            "last_ms": self.last_latency * 1000,
+            "mean_ms": self.total_latency * 1000 / self.count if self.count else 0.0,
+            "max_ms": self.max_latency * 1000,
+            "sources": dict(self.sources),
+        }
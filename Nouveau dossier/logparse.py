@@ -0,0 +1,131 @@
+import sys
+import json
+import time
+import argparse
+from collections import namedtuple
+
+try:
+    import orjson
+    loads = orjson.loads
+    JSON_ERRORS = (orjson.JSONDecodeError,)
+except ImportError:
+    orjson = None
+    loads = json.loads
+    JSON_ERRORS = (ValueError,)
+
+from pieces import CELL_COORDS, cell_name, to_cell
+
+# --- Lecture unifiée de games.log ---
+# Trois formes de coups cohabitent dans le log :
+#   {"piece", "coord": "B1"}      geniusDice2 (une case par coup)
+#   {"piece", "position": [r, c]} geniusDicee (coin de la pièce)
+#   {"piece", "pos": [r, c]}      zzzzz (coin de la pièce)
+# et les dés sont sous "dice" ([r, c]) ou "dice_roll" ("B3"). Tout est
+# ramené à un Game compact : dés et cases des coups en bytes (cases de
+# pieces.py), pièces en une chaîne d'une lettre par coup, horodatages en
+# tuple ; schema indique d'où vient la partie. orjson est utilisé s'il est
+# installé.
+
+Move = namedtuple("Move", "piece cell timestamp")
+
+class Game(namedtuple("Game", "player dice pieces cells times duration schema")):
+    __slots__ = ()
+
+    def moves(self):
+        return [Move(p, cell, t) for p, cell, t in zip(self.pieces, self.cells, self.times)]
+
+    def dice_coords(self):
+        return [CELL_COORDS[cell] for cell in self.dice]
+
+    def end_time(self):
+        # Horodatage du dernier coup, None si la partie n'en a pas
+        return self.times[-1] if self.times else None
+
+    def to_dict(self):
+        # Même forme que la ligne d'origine (clés du schéma)
+        if self.schema == "coord":
+            dice_key, cell = "dice_roll", cell_name
+        else:
+            dice_key, cell = "dice", lambda i: list(CELL_COORDS[i])
+        return {
+            "player": self.player,
+            dice_key: [cell(i) for i in self.dice],
+            "moves": [{"piece": m.piece, self.schema: cell(m.cell), "timestamp": m.timestamp} for m in self.moves()],
+            "duration": self.duration,
+        }
+
+def normalize(data):
+    # dict décodé -> Game (KeyError, IndexError, TypeError... si illisible)
+    dice = data.get("dice")
+    if dice is None:
+        dice = data["dice_roll"]
+    moves = data.get("moves") or ()
+    schema = "coord" if "dice_roll" in data else "pos"
+    if moves:
+        first = moves[0]
+        schema = "pos" if "pos" in first else "position" if "position" in first else "coord"
+    pieces = "".join([m["piece"] for m in moves])
+    if len(pieces) != len(moves):
+        raise ValueError("pièce de plus d'une lettre")
+    return Game(
+        str(data.get("player", "")),
+        bytes([to_cell(d) for d in dice]),
+        pieces,
+        bytes([to_cell(m[schema]) for m in moves]),
+        tuple([m.get("timestamp") for m in moves]),
+        data.get("duration", 0),
+        schema,
+    )
+
+def parse_line(line):
+    # Ligne (bytes ou str) -> Game, ou None si elle est illisible
+    try:
+        return normalize(loads(line))
+    except JSON_ERRORS + (KeyError, IndexError, TypeError, ValueError, AttributeError):
+        return None
+
+def iter_records(path="games.log", errors=None):
+    # Parties lues en flux ; errors : liste optionnelle qui reçoit les
+    # numéros (à partir de 0) des lignes non vides illisibles
+    with open(path, "rb") as f:
+        n = 0
+        for line in f:
+            if not line.strip():
+                continue
+            game = parse_line(line)
+            if game is not None:
+                yield game
+            elif errors is not None:
+                errors.append(n)
+            n += 1
+
+def summary(path="games.log"):
+    # Par joueur : nombre de parties, durée moyenne, coups moyens
+    players = {}
+    for game in iter_records(path):
+        count, duration, moves = players.get(game.player, (0, 0, 0))
+        players[game.player] = (count + 1, duration + (game.duration or 0), moves + len(game.pieces))
+    return {p: {"games": n, "mean_duration": d / n, "mean_moves": m / n} for p, (n, d, m) in players.items()}
+
+def bench(path="games.log", repeat=3):
+    # Parties lues par seconde (meilleur de `repeat` passes)
+    best = None
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_records(path))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, count / best if best else 0.0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lit games.log (tous schémas) : résumé par joueur ou débit.")
+    parser.add_argument("path", nargs="?", default="games.log")
+    parser.add_argument("--bench", action="store_true", help="mesure le débit en parties par seconde")
+    args = parser.parse_args()
+    if args.bench:
+        count, rate = bench(args.path)
+        print(f"{count} parties, {rate:.0f} parties/s ({'json' if orjson is None else 'orjson'})")
+        sys.exit(0)
+    for player, stats in sorted(summary(args.path).items()):
+        print(f"{player:20} {stats['games']:6} parties  {stats['mean_duration']:8.1f} s  {stats['mean_moves']:6.1f} coups")
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+
+from gamelog import LOG_FILE, GameIndex
+
+# --- Écriture de games.log en arrière-plan ---
+# write() met la partie dans une file bornée et rend la main tout de suite ;
+# un thread écrit les parties par lots dans le fichier, qui reste ouvert,
+# puis met à jour l'index games.log.idx (gamelog.GameIndex). Tout accès
+# disque, index compris, se fait dans ce thread.
+# fsync : "batch" après chaque lot, "never", ou un nombre de secondes
+#         (au plus un fsync par intervalle)
+# on_full : file pleine -> "drop" (partie perdue, comptée dans dropped),
+#           "block" (attend au plus block_timeout secondes, puis drop)
+# close() (appelé aussi à la sortie du programme) écrit tout ce qui reste.
+# Une erreur disque est gardée dans error ; le thread continue et chaque
+# partie reçue est marquée traitée, pour que flush() et close() rendent
+# toujours la main.
+
+class LogWriter:
+    def __init__(self, path=LOG_FILE, maxsize=1024, batch=256, flush_interval=0.5,
+                 fsync="batch", on_full="drop", block_timeout=1.0, index=True):
+        if on_full not in ("drop", "block"):
+            raise ValueError(f"on_full inconnu : {on_full}")
+        if fsync not in ("batch", "never") and (isinstance(fsync, bool) or not isinstance(fsync, (int, float)) or fsync < 0):
+            raise ValueError(f"fsync inconnu : {fsync!r}")
+        self.path = path
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.use_index = index
+        self.index = None      # créé par le thread d'écriture
+        self.queue = queue.Queue(maxsize)
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.fsyncs = 0
+        self.error = None
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, game):
+        # True si la partie est dans la file, False si elle a été perdue
+        if self._closed:
+            raise ValueError("LogWriter fermé")
+        line = json.dumps(game) + "\n"
+        try:
+            if self.on_full == "block":
+                self.queue.put(line, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(line)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        # Attend que tout ce qui a été accepté soit traité (écrit ou perdu)
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks and self._thread.is_alive():
+                self.queue.all_tasks_done.wait(0.1)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        while self._thread.is_alive():
+            try:
+                self.queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        f = None
+        done = False
+        while not done:
+            try:
+                lines = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if f is not None:
+                    self._after_write(f, index=False)
+                continue
+            while len(lines) < self.batch:
+                try:
+                    lines.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in lines:
+                done = True
+                lines = [line for line in lines if line is not None]
+            try:
+                if lines:
+                    try:
+                        if f is None:
+                            f = open(self.path, "a", encoding="utf-8")
+                        f.write("".join(lines))
+                        f.flush()
+                    except OSError as e:
+                        # Lot perdu ; le fichier sera rouvert pour le suivant
+                        self.error = e
+                        self.dropped += len(lines)
+                        f = self._close_file(f)
+                    else:
+                        self.written += len(lines)
+                        self.batches += 1
+                        self._dirty = True
+                        self._after_write(f, force=done)
+            finally:
+                for _ in range(len(lines) + done):
+                    self.queue.task_done()
+        if f is not None:
+            # Ce qui reste à synchroniser (politique par intervalle)
+            self._after_write(f, force=True, index=False)
+        self._close_file(f)
+
+    def _after_write(self, f, force=False, index=True):
+        # fsync et index : les parties sont déjà dans le log, une erreur ici
+        # est seulement notée
+        try:
+            self._sync(f, force)
+            if index and self.use_index:
+                if self.index is None:
+                    self.index = GameIndex(self.path)
+                else:
+                    self.index.refresh()
+        except Exception as e:
+            self.error = e
+
+    def _close_file(self, f):
+        if f is not None:
+            try:
+                f.close()
+            except OSError as e:
+                self.error = e
+        return None
+
+    def _sync(self, f, force=False):
+        # fsync selon la politique ; force : fin d'écriture (fermeture)
+        if not self._dirty or self.fsync == "never":
+            return
+        now = time.monotonic()
+        if not force and self.fsync != "batch" and now - self._last_fsync < self.fsync:
+            return
+        os.fsync(f.fileno())
+        self._last_fsync = now
+        self._dirty = False
+        self.fsyncs += 1
+
+    def counters(self):
+        return {"written": self.written, "batches": self.batches, "dropped": self.dropped,
+                "fsyncs": self.fsyncs, "pending": self.queue.qsize()}
+
+# Un écrivain partagé par fichier, pour les applications
+_writers = {}
+
+def writer(path=LOG_FILE):
+    if path not in _writers:
+        _writers[path] = LogWriter(path)
+    return _writers[path]
+
+def log_game(game, path=LOG_FILE):
+    return writer(path).write(game)
+
+def flush(path=None):
+    # Attend l'écriture des parties en file (toutes si path est None)
+    for p, w in list(_writers.items()):
+        if path is None or p == path:
+            w.flush()
@@ -0,0 +1,128 @@
+import time
+
+from pieces import PIECES, coords_mask
+from solver import solve, SolveCancelled
+
+# --- Oracle de solvabilité incrémental ---
+# Garde, d'un coup à l'autre, une solution témoin pour les pièces restantes.
+# Après un placement, seules les pièces dont le témoin est touché sont
+# replacées ; après un retrait, la pièce retirée reprend sa place dans le
+# témoin. Une nouvelle recherche n'a lieu qu'en dernier recours, bornée
+# par `budget` secondes pour répondre dans la frame (16 ms).
+
+SOLVABLE = True
+DEAD_END = False
+UNKNOWN = None
+
+class SolvabilityOracle:
+    def __init__(self, blocked, pieces=None, budget=0.010, backend='cells'):
+        self.blocked = blocked
+        self.pieces = list(PIECES) if pieces is None else list(pieces)
+        self.budget = budget
+        self.backend = backend
+        self.placed = {}       # pièce -> masque posé par le joueur
+        self.witness = None    # pièce restante -> masque, si une solution est connue
+        self.known = {}        # (cases occupées, pièces restantes) -> statut
+        self.last_latency = 0.0
+        self.status = self._evaluate()
+
+    def occupied(self):
+        occupied = self.blocked
+        for m in self.placed.values():
+            occupied |= m
+        return occupied
+
+    def remaining(self):
+        return [p for p in self.pieces if p not in self.placed]
+
+    def place(self, piece, mask):
+        if piece in self.placed:
+            return self.move(piece, mask)
+        self.placed[piece] = mask
+        if self.witness is not None:
+            self.witness.pop(piece, None)
+        self.status = self._evaluate()
+        return self.status
+
+    def move(self, piece, mask):
+        # Pièce déjà posée déplacée : une seule évaluation, pas un retrait
+        # puis une pose (deux budgets de recherche dans la même frame)
+        self.placed[piece] = mask
+        if self.witness is not None:
+            self.witness.pop(piece, None)
+        self.status = self._evaluate()
+        return self.status
+
+    def remove(self, piece):
+        mask = self.placed.pop(piece, None)
+        if mask is None:
+            return self.status
+        # Le témoin précédent plus la pièce retirée reste une solution
+        if self.witness is not None:
+            self.witness[piece] = mask
+        self.status = self._evaluate()
+        return self.status
+
+    def _evaluate(self):
+        start = time.perf_counter()
+        try:
+            return self._search()
+        finally:
+            self.last_latency = time.perf_counter() - start
+
+    def _search(self):
+        occupied = self.occupied()
+        remaining = self.remaining()
+        key = (occupied, "".join(remaining))
+        if key in self.known:
+            status = self.known[key]
+            if status is not SOLVABLE or self._witness_ok(occupied, remaining):
+                return status
+
+        # Réparation : on garde les placements du témoin encore valides
+        kept = {}
+        base = occupied
+        if self.witness is not None:
+            for p in remaining:
+                m = self.witness.get(p)
+                if m is not None and not base & m:
+                    kept[p] = m
+                    base |= m
+        missing = [p for p in remaining if p not in kept]
+        if not missing:
+            self.witness = kept
+            self.known[key] = SOLVABLE
+            return SOLVABLE
+
+        deadline = time.perf_counter() + self.budget
+        too_long = lambda nodes: time.perf_counter() > deadline
+        try:
+            if kept:
+                sol = solve(base, missing, backend=self.backend, progress=too_long)
+                if sol is not None:
+                    self.witness = dict(kept, **self._masks(sol))
+                    self.known[key] = SOLVABLE
+                    return SOLVABLE
+            sol = solve(occupied, remaining, backend=self.backend, progress=too_long)
+        except SolveCancelled:
+            return UNKNOWN
+        if sol is None:
+            self.witness = None
+            self.known[key] = DEAD_END
+            return DEAD_END
+        self.witness = self._masks(sol)
+        self.known[key] = SOLVABLE
+        return SOLVABLE
+
+    def _witness_ok(self, occupied, remaining):
+        if self.witness is None or set(self.witness) != set(remaining):
+            return False
+        for m in self.witness.values():
+            if occupied & m:
+                return False
+            occupied |= m
+        return True
+
+    @staticmethod
+    def _masks(solution):
+        return {p: coords_mask(coords) for p, coords in solution.items()}
@@ -0,0 +1,118 @@
+GRID_SIZE = 6
+CELLS = GRID_SIZE * GRID_SIZE
+FULL = (1 << CELLS) - 1
+LETTERS = "ABCDEF"
+
+# --- Géométrie des pièces (sans tkinter, partagée par les solvers) ---
+
+PIECES = {
+    'L': [(0,0),(1,0),(2,0),(2,1)],
+    'N': [(0,1),(1,1),(1,0),(2,0)],
+    'T': [(0,0),(0,1),(0,2),(1,1)],
+    'U': [(0,0),(0,2),(1,0),(1,1),(1,2)],
+    'V': [(0,0),(1,0),(2,0),(2,1)],
+    'W': [(0,0),(1,0),(1,1),(2,1)],
+    'X': [(0,1),(1,0),(1,1),(1,2),(2,1)],
+    'Y': [(0,1),(1,1),(2,1),(3,1),(3,0)],
+    'Z': [(0,0),(0,1),(1,1),(1,2)]
+}
+
+SIZES = {k: len(v) for k,v in PIECES.items()}
+
+def all_orientations(shape):
+    shapes = set()
+    coords = shape
+    for flip in (False, True):
+        for rot in range(4):
+            pts = coords
+            if flip:
+                pts = [(-x,y) for x,y in pts]
+            for _ in range(rot):
+                pts = [(y, -x) for x,y in pts]
+            minx = min(x for x,y in pts)
+            miny = min(y for x,y in pts)
+            norm = tuple(sorted(((x - minx, y - miny) for x,y in pts)))
+            shapes.add(norm)
+    return shapes
+
+ALL_PIECES = {k: list(all_orientations(v)) for k,v in PIECES.items()}
+
+# --- Numérotation des cases ---
+# Même numérotation que covertSingle() dans geniusDice.py : la lettre est la
+# ligne, le chiffre la colonne, "A6" -> bit 5, "F6" -> bit 0, "A1" -> bit 35.
+
+def cell_index(r, c):
+    return (GRID_SIZE - 1 - r) + (GRID_SIZE - 1 - c) * GRID_SIZE
+
+CELL_COORDS = [None] * CELLS
+for _r in range(GRID_SIZE):
+    for _c in range(GRID_SIZE):
+        CELL_COORDS[cell_index(_r, _c)] = (_r, _c)
+
+def coord_name(r, c):
+    return LETTERS[r] + str(c + 1)
+
+def cell_name(i):
+    return coord_name(*CELL_COORDS[i])
+
+# "B3" -> case, [r][c] -> case (tables : to_cell sert à lire tout games.log)
+NAME_CELL = {coord_name(r, c): cell_index(r, c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)}
+COORD_CELL = [[cell_index(r, c) for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+
+def to_cell(cell):
+    # Accepte "B3" (format de geniusDice2) ou [r, c] (geniusDicee / zzzzz) ;
+    # KeyError ou IndexError pour une case hors du plateau
+    if isinstance(cell, str):
+        return NAME_CELL[cell.upper()]
+    r, c = cell
+    if r < 0 or c < 0:
+        raise IndexError(cell)
+    return COORD_CELL[r][c]
+
+def blockers_mask(cells):
+    mask = 0
+    for cell in cells:
+        mask |= 1 << to_cell(cell)
+    return mask
+
+def coords_mask(coords):
+    mask = 0
+    for r, c in coords:
+        mask |= 1 << cell_index(r, c)
+    return mask
+
+def mask_coords(mask):
+    return sorted(CELL_COORDS[i] for i in range(CELLS) if mask >> i & 1)
+
+def fitting_pieces(blocked, pieces=None):
+    # Les 9 pièces font 39 cases pour au plus 30 cases libres : on garde les
+    # plus petites tant qu'elles tiennent (7 pièces avec les vrais dés)
+    free = CELLS - bin(blocked).count("1")
+    fitting = []
+    for p in sorted(PIECES if pieces is None else pieces, key=lambda p: SIZES[p]):
+        if SIZES[p] > free:
+            break
+        fitting.append(p)
+        free -= SIZES[p]
+    return fitting
+
+def board_mask(board):
+    # Toute case non vide ('#' ou pièce) est occupée
+    mask = 0
+    for r in range(GRID_SIZE):
+        for c in range(GRID_SIZE):
+            if board[r][c] != '':
+                mask |= 1 << cell_index(r, c)
+    return mask
+
+# --- Placements (voir placements.py pour la table précalculée) ---
+
+def placements(piece):
+    masks = []
+    for orient in ALL_PIECES[piece]:
+        max_x = max(x for x,y in orient)
+        max_y = max(y for x,y in orient)
+        for i in range(GRID_SIZE - max_x):
+            for j in range(GRID_SIZE - max_y):
+                masks.append(coords_mask((i + x, j + y) for x,y in orient))
+    return masks
@@ -0,0 +1,104 @@
+import os
+import mmap
+import struct
+import zlib
+
+from pieces import PIECES, CELLS, placements
+
+# --- Table des placements précalculée ---
+# Pour chaque pièce, tous les masques de 36 bits posables sur le plateau,
+# regroupés par case la plus basse couverte. La table est générée une fois
+# dans placements.bin puis relue par mmap au démarrage.
+#
+# Format (little-endian) :
+#   en-tête  : b"GSQP", version (B), nombre de pièces (B), crc32 de PIECES (I)
+#   par pièce : nom (c) + 36 compteurs (H), un par case la plus basse
+#   puis tous les masques (Q), pièce par pièce, case par case
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "placements.bin")
+MAGIC = b"GSQP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBI")
+PIECE_HEADER = struct.Struct("<c%dH" % CELLS)
+
+def geometry_crc():
+    return zlib.crc32(repr(sorted(PIECES.items())).encode())
+
+def lowest_cell(mask):
+    return (mask & -mask).bit_length() - 1
+
+def build_table():
+    by_cell = {}
+    for piece in PIECES:
+        groups = [[] for _ in range(CELLS)]
+        for m in placements(piece):
+            groups[lowest_cell(m)].append(m)
+        by_cell[piece] = tuple(tuple(g) for g in groups)
+    return by_cell
+
+def write_table(by_cell, path=TABLE_FILE):
+    parts = [HEADER.pack(MAGIC, VERSION, len(by_cell), geometry_crc())]
+    for piece, groups in by_cell.items():
+        parts.append(PIECE_HEADER.pack(piece.encode(), *(len(g) for g in groups)))
+    for groups in by_cell.values():
+        for g in groups:
+            parts.append(struct.pack("<%dQ" % len(g), *g))
+    # Écriture atomique : plusieurs workers peuvent démarrer en même temps
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(b"".join(parts))
+    os.replace(tmp, path)
+
+def read_table(path=TABLE_FILE):
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, npieces, crc = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION or crc != geometry_crc():
+                raise ValueError(f"Table de placements obsolète : {path}")
+            offset = HEADER.size
+            counts = {}
+            for _ in range(npieces):
+                name, *n = PIECE_HEADER.unpack_from(mm, offset)
+                counts[name.decode()] = n
+                offset += PIECE_HEADER.size
+            total = sum(sum(n) for n in counts.values())
+            masks = struct.unpack_from("<%dQ" % total, mm, offset)
+    by_cell = {}
+    pos = 0
+    for piece, n in counts.items():
+        groups = []
+        for k in n:
+            groups.append(masks[pos:pos + k])
+            pos += k
+        by_cell[piece] = tuple(groups)
+    return by_cell
+
+def load_table(path=TABLE_FILE):
+    try:
+        return read_table(path)
+    except (OSError, ValueError, struct.error):
+        by_cell = build_table()
+        try:
+            write_table(by_cell, path)
+        except OSError:
+            pass
+        return by_cell
+
+BY_CELL = load_table()
+PLACEMENTS = {piece: tuple(m for g in groups for m in g) for piece, groups in BY_CELL.items()}
+# COVERING[p][c] : placements de p qui couvrent la case c (où qu'ils soient)
+COVERING = {piece: tuple(tuple(m for m in masks if m >> c & 1) for c in range(CELLS))
+            for piece, masks in PLACEMENTS.items()}
+
+def placements_crc():
+    # crc32 de PLACEMENTS dans l'ordre : change si un indice de placement
+    # ne désigne plus le même masque (contrairement à geometry_crc)
+    crc = 0
+    for piece, masks in PLACEMENTS.items():
+        crc = zlib.crc32(piece.encode() + struct.pack("<%dQ" % len(masks), *masks), crc)
+    return crc
+
+if __name__ == "__main__":
+    write_table(build_table())
+    total = sum(len(v) for v in PLACEMENTS.values())
+    print(f"{TABLE_FILE} : {total} placements, {os.path.getsize(TABLE_FILE)} octets")
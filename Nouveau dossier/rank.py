@@ -0,0 +1,95 @@
+from math import comb
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pieces import CELLS, blockers_mask
+
+# --- Rang combinatoire des ensembles de cases bloquées ---
+# Un ensemble de k cases {c1 < c2 < ... < ck} (numérotation de pieces.py,
+# celle de covertSingle) a pour rang C(c1,1) + C(c2,2) + ... + C(ck,k) :
+# les C(36,k) ensembles de k cases sont numérotés de 0 à C(36,k) - 1 sans
+# trou (6 dés : 1 947 792, 7 dés : 8 347 680), contre 2^36 pour le masque,
+# dans l'ordre colexicographique (ck d'abord, puis c(k-1)...).
+# C'est la clé commune du cache (cache.py) et des parts de sweep.py.
+# rolldb.py garde dice.roll_rank : ses enregistrements sont à une position
+# fixe, et le rang des faces ne numérote que les 62 208 tirages possibles,
+# sans trou, alors que celui-ci en réserverait 8 347 680 pour 7 cases.
+# index() ajoute le nombre d'ensembles plus petits pour numéroter toutes
+# les tailles à la suite.
+
+BINOM = [[comb(n, k) for k in range(CELLS + 2)] for n in range(CELLS + 1)]
+OFFSETS = [sum(comb(CELLS, j) for j in range(k)) for k in range(CELLS + 2)]
+
+def count(k):
+    return BINOM[CELLS][k]
+
+def rank(blockers):
+    # blockers : masque ou liste de cases ("B3" ou [r, c])
+    mask = blockers if isinstance(blockers, int) else blockers_mask(blockers)
+    r = j = 0
+    while mask:
+        bit = mask & -mask
+        j += 1
+        r += BINOM[bit.bit_length() - 1][j]
+        mask ^= bit
+    return r
+
+def unrank(r, k):
+    if not 0 <= r < count(k):
+        raise ValueError(f"rang {r} hors de 0..{count(k) - 1} pour {k} cases")
+    mask = 0
+    c = CELLS
+    for j in range(k, 0, -1):
+        c -= 1
+        while BINOM[c][j] > r:
+            c -= 1
+        r -= BINOM[c][j]
+        mask |= 1 << c
+    return mask
+
+def index(blockers):
+    # Rang parmi tous les ensembles, toutes tailles confondues
+    mask = blockers if isinstance(blockers, int) else blockers_mask(blockers)
+    return OFFSETS[mask.bit_count()] + rank(mask)
+
+def from_index(i):
+    k = 0
+    while OFFSETS[k + 1] <= i:
+        k += 1
+    return unrank(i - OFFSETS[k], k)
+
+def shard(blockers, shards):
+    return rank(blockers) % shards
+
+# --- Versions NumPy (tableaux de masques uint64 / de rangs int64) ---
+
+NP_BINOM = None if np is None else np.array(BINOM, dtype=np.int64)
+
+def rank_many(masks):
+    if np is None:
+        raise ImportError("rank_many() demande NumPy (pip install numpy)")
+    masks = np.asarray(masks, dtype=np.uint64)
+    ranks = np.zeros(masks.shape, dtype=np.int64)
+    j = np.zeros(masks.shape, dtype=np.int64)
+    for c in range(CELLS):
+        bit = ((masks >> np.uint64(c)) & np.uint64(1)).astype(bool)
+        j += bit
+        ranks += np.where(bit, NP_BINOM[c][j], 0)
+    return ranks
+
+def unrank_many(ranks, k):
+    if np is None:
+        raise ImportError("unrank_many() demande NumPy (pip install numpy)")
+    r = np.array(ranks, dtype=np.int64)
+    if r.size and (r.min() < 0 or r.max() >= count(k)):
+        raise ValueError(f"rang hors de 0..{count(k) - 1} pour {k} cases")
+    masks = np.zeros(r.shape, dtype=np.uint64)
+    for j in range(k, 0, -1):
+        # Plus grande case c telle que C(c, j) <= r (C(c, j) croît avec c)
+        c = np.searchsorted(NP_BINOM[:, j], r, side="right") - 1
+        r -= NP_BINOM[c, j]
+        masks |= np.uint64(1) << c.astype(np.uint64)
+    return masks
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+
+from pieces import CELL_COORDS, coord_name, to_cell
+from gamelog import iter_games
+
+# --- Format binaire des replays ---
+# Les lignes de games.log répètent "piece", "coord", "timestamp"... à chaque
+# coup. Ici un coup tient en 3 octets le plus souvent : pièce (code ASCII),
+# case (numérotation de pieces.py), écart en ms avec le coup précédent
+# (varint). Les horodatages sont arrondis à la milliseconde ; tout le reste
+# est conservé. Une partie qui ne rentre pas dans ce moule (clés en plus,
+# case hors plateau...) est gardée telle quelle en JSON dans le fichier.
+#
+# Fichier : b"GSQR", version (B), puis pour chaque partie sa taille (varint)
+# et son contenu :
+#   schéma (B) : 0 "coord" (geniusDice2), 1 "position" (geniusDicee),
+#                2 "pos" (zzzzz), RAW = JSON brut (taille varint + octets)
+#   options (B) : DICE_ROLL (clé "dice_roll"), DICE_NAMES (dés en "B3"),
+#                 FLOAT_DURATION (durée non entière, en double)
+#   joueur (taille varint + utf-8), durée (varint ou double),
+#   dés (nombre B + une case par dé),
+#   coups (nombre varint, heure du premier en ms depuis 1970 varint,
+#          puis pièce B, case B, écart en ms zigzag-varint par coup)
+
+MAGIC = b"GSQR"
+VERSION = 1
+MOVE_KEYS = ["coord", "position", "pos"]
+RAW = 0xFF
+DICE_ROLL = 1
+DICE_NAMES = 2
+FLOAT_DURATION = 4
+DOUBLE = struct.Struct("<d")
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+def read_varint(data, i):
+    n = shift = 0
+    while True:
+        b = data[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+def write_text(out, text):
+    raw = text.encode("utf-8")
+    write_varint(out, len(raw))
+    out += raw
+
+def read_text(data, i):
+    n, i = read_varint(data, i)
+    return data[i:i + n].decode("utf-8"), i + n
+
+CELL_NAMES = [coord_name(r, c) for r, c in CELL_COORDS]
+
+def cell_value(cell, names):
+    return CELL_NAMES[cell] if names else list(CELL_COORDS[cell])
+
+def rounded(game):
+    # La partie telle qu'elle sort du format binaire (horodatages au ms)
+    moves = game.get("moves")
+    if not isinstance(moves, list):
+        return game
+    game = dict(game)
+    game["moves"] = [dict(m, timestamp=round(m["timestamp"] * 1000) / 1000)
+                     if isinstance(m, dict) and isinstance(m.get("timestamp"), (int, float)) else m
+                     for m in moves]
+    return game
+
+def _encode(game):
+    dice_key = "dice_roll" if "dice_roll" in game else "dice"
+    moves = game["moves"]
+    schema = MOVE_KEYS.index(next(k for k in MOVE_KEYS if k in moves[0])) if moves else 2
+    key = MOVE_KEYS[schema]
+    dice = game[dice_key]
+    duration = game["duration"]
+    flags = (DICE_ROLL if dice_key == "dice_roll" else 0) | (DICE_NAMES if dice and isinstance(dice[0], str) else 0)
+    if not isinstance(duration, int) or duration < 0:
+        flags |= FLOAT_DURATION
+    out = bytearray([schema, flags])
+    write_text(out, game["player"])
+    if flags & FLOAT_DURATION:
+        out += DOUBLE.pack(duration)
+    else:
+        write_varint(out, duration)
+    out.append(len(dice))
+    out += bytes(to_cell(d) for d in dice)
+    write_varint(out, len(moves))
+    previous = None
+    for m in moves:
+        ms = round(m["timestamp"] * 1000)
+        if previous is None:
+            write_varint(out, ms)
+            previous = ms
+        out.append(ord(m["piece"]))
+        out.append(to_cell(m[key]))
+        delta = ms - previous
+        write_varint(out, delta << 1 if delta >= 0 else (-delta << 1) - 1)
+        previous = ms
+    return out
+
+def encode(game):
+    # Octets d'une partie ; repli sur le JSON brut si la conversion perdrait quelque chose
+    try:
+        body = _encode(game)
+        if decode(body) == rounded(game):
+            return bytes(body)
+    except (KeyError, TypeError, ValueError, IndexError, AttributeError, StopIteration, OverflowError, struct.error):
+        pass
+    body = bytearray([RAW])
+    write_text(body, json.dumps(game))
+    return bytes(body)
+
+def _header(data, i):
+    flags = data[i + 1]
+    player, i = read_text(data, i + 2)
+    if flags & FLOAT_DURATION:
+        duration = DOUBLE.unpack_from(data, i)[0]
+        i += DOUBLE.size
+    else:
+        duration, i = read_varint(data, i)
+    ndice = data[i]
+    return flags, player, duration, data[i + 1:i + 1 + ndice], i + 1 + ndice
+
+def decode(data, i=0):
+    # Partie sous la même forme que dans games.log
+    schema = data[i]
+    if schema == RAW:
+        text, _ = read_text(data, i + 1)
+        return json.loads(text)
+    flags, player, duration, cells, i = _header(data, i)
+    names = flags & DICE_NAMES
+    dice = [cell_value(cell, names) for cell in cells]
+    key = MOVE_KEYS[schema]
+    if schema == 0:
+        moves = [{"piece": p, key: CELL_NAMES[cell], "timestamp": ms / 1000} for p, cell, ms in _moves(data, i)]
+    else:
+        moves = [{"piece": p, key: list(CELL_COORDS[cell]), "timestamp": ms / 1000} for p, cell, ms in _moves(data, i)]
+    return {"player": player, "dice_roll" if flags & DICE_ROLL else "dice": dice, "moves": moves, "duration": duration}
+
+def decode_compact(data):
+    # (joueur, cases des dés, [(pièce, case, heure ms)...], durée), sans
+    # dictionnaires ; None pour une partie gardée en JSON brut
+    if data[0] == RAW:
+        return None
+    flags, player, duration, cells, i = _header(data, 0)
+    return player, list(cells), _moves(data, i), duration
+
+def _moves(data, i):
+    # (pièce, case, heure en ms) pour chaque coup, à partir du nombre de coups
+    nmoves, i = read_varint(data, i)
+    moves = []
+    if nmoves:
+        ms, i = read_varint(data, i)
+        for _ in range(nmoves):
+            b = data[i + 2]
+            if b < 0x80:
+                z = b
+                piece, cell = data[i], data[i + 1]
+                i += 3
+            else:
+                piece, cell = data[i], data[i + 1]
+                z, i = read_varint(data, i + 2)
+            ms += z >> 1 if not z & 1 else -((z + 1) >> 1)
+            moves.append((chr(piece), cell, ms))
+    return moves
+
+# --- Fichiers ---
+
+def write_replays(path, games):
+    count = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([VERSION]))
+        for game in games:
+            body = encode(game)
+            size = bytearray()
+            write_varint(size, len(body))
+            f.write(size + body)
+            count += 1
+    return count
+
+def is_replay_file(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def iter_records(path):
+    # Contenu brut de chaque partie, lu en flux
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + 1)
+        if head[:len(MAGIC)] != MAGIC or head[len(MAGIC):] != bytes([VERSION]):
+            raise ValueError(f"Fichier de replays inconnu : {path}")
+        while True:
+            size = shift = 0
+            while True:
+                b = f.read(1)
+                if not b:
+                    return
+                size |= (b[0] & 0x7F) << shift
+                if b[0] < 0x80:
+                    break
+                shift += 7
+            yield f.read(size)
+
+def iter_replays(path):
+    for body in iter_records(path):
+        yield decode(body)
+
+def iter_compact(path):
+    for body in iter_records(path):
+        yield decode_compact(body)
+
+def read_replay(path, n):
+    # Partie n (0 = première) : les autres sont sautées sans être décodées
+    for k, body in enumerate(iter_records(path)):
+        if k == n:
+            return decode(body)
+    raise IndexError(f"pas de partie {n}")
+
+def count_replays(path):
+    return sum(1 for _ in iter_records(path))
+
+def jsonl_to_replays(src, dst):
+    # Les lignes illisibles de src sont ignorées (comme gamelog.iter_games)
+    return write_replays(dst, iter_games(src))
+
+def replays_to_jsonl(src, dst):
+    count = 0
+    with open(dst, "w", encoding="utf-8") as f:
+        for game in iter_replays(src):
+            f.write(json.dumps(game) + "\n")
+            count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversion games.log <-> replays binaires.")
+    parser.add_argument("command", choices=["encode", "decode"], help="encode : JSONL -> binaire, decode : binaire -> JSONL")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    convert = jsonl_to_replays if args.command == "encode" else replays_to_jsonl
+    count = convert(args.source, args.destination)
+    before, after = os.path.getsize(args.source), os.path.getsize(args.destination)
+    print(f"{count} parties, {before} -> {after} octets ({time.perf_counter() - start:.2f} s)", file=sys.stderr)
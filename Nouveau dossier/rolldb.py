@@ -0,0 +1,183 @@
+import os
+import sys
+import mmap
+import struct
+import zlib
+import random
+import argparse
+from multiprocessing import Pool
+
+import dice
+from pieces import PIECES, coords_mask, mask_coords, blockers_mask
+from placements import PLACEMENTS, placements_crc
+from solver import solve, BACKENDS, DEFAULT_BACKEND
+from symmetry import canonical, from_canonical
+from sweep import solve_class
+
+# --- Base de solutions indexée par tirage ---
+# Un enregistrement de taille fixe par tirage distinct de la vraie table,
+# à la position roll_rank(tirage) (voir dice.py) : une recherche est un
+# simple accès dans le fichier ouvert par mmap, partagé entre processus
+# par le cache de pages, sans rien décoder d'autre que l'enregistrement.
+# La position vient de dice.roll_rank et pas de rank.index (la clé du
+# cache) : 62 208 enregistrements au lieu de C(36, 7) = 8 347 680, dont
+# presque tous vides, pour un fichier plus de 100 fois plus gros.
+#
+# Format (little-endian) :
+#   en-tête : b"GSQD", version (B), nombre de pièces (B), pièces (16s),
+#             crc32 de PLACEMENTS dans l'ordre (I), crc32 de la table des dés (I),
+#             nombre d'enregistrements (I)
+#   enregistrement : drapeaux (B) + un octet par pièce, indice du placement
+#             dans PLACEMENTS[pièce] (ABSENT = 0xFF si pas de solution)
+
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solutions.db")
+MAGIC = b"GSQD"
+VERSION = 2
+HEADER = struct.Struct("<4sBB16sIII")
+ABSENT = 0xFF
+KNOWN = 1       # enregistrement rempli
+SOLVABLE = 2    # une solution est stockée
+
+PLACEMENT_INDEX = {p: {m: k for k, m in enumerate(masks)} for p, masks in PLACEMENTS.items()}
+
+def dice_crc():
+    return zlib.crc32(repr(dice.DES).encode())
+
+def encode(solution, pieces):
+    if solution is None:
+        return bytes([KNOWN]) + bytes([ABSENT] * len(pieces))
+    return bytes([KNOWN | SOLVABLE] + [PLACEMENT_INDEX[p][coords_mask(solution[p])] for p in pieces])
+
+class SolutionDB:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, npieces, names, pcrc, dcrc, count = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION or pcrc != placements_crc() or dcrc != dice_crc():
+                raise ValueError(f"Base de solutions obsolète : {path}")
+            if count != dice.count_outcomes() or len(self._mm) != HEADER.size + count * (1 + npieces):
+                raise ValueError(f"Base de solutions tronquée : {path}")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self.pieces = list(names[:npieces].decode())
+        self.width = 1 + npieces
+        self.count = count
+
+    def record(self, rank):
+        offset = HEADER.size + rank * self.width
+        return self._mm[offset:offset + self.width]
+
+    def get(self, rank):
+        # (connu, solution {pièce: coords} ou None) pour un rang de tirage
+        if not 0 <= rank < self.count:
+            raise IndexError(f"rang hors de la base : {rank}")
+        rec = self.record(rank)
+        if not rec[0] & KNOWN:
+            return False, None
+        if not rec[0] & SOLVABLE:
+            return True, None
+        return True, {p: mask_coords(PLACEMENTS[p][k]) for p, k in zip(self.pieces, rec[1:])}
+
+    def lookup(self, blocked, pieces=None):
+        # Comme SolutionCache.lookup : rien de connu si le masque ne vient pas
+        # de la vraie table ou si les pièces ne sont pas celles de la base
+        if pieces is not None and sorted(pieces) != sorted(self.pieces):
+            return False, None
+        roll = dice.roll_from_mask(blocked)
+        if roll is None:
+            return False, None
+        return self.get(dice.roll_rank(roll))
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+def open_db(path=DB_FILE):
+    # Base par défaut si elle existe et correspond au code, sinon None
+    try:
+        return SolutionDB(path)
+    except (OSError, ValueError):
+        return None
+
+def build(path=DB_FILE, pieces=None, backend=DEFAULT_BACKEND, workers=None, chunksize=64):
+    pieces = list(PIECES) if pieces is None else list(pieces)
+    count = dice.count_outcomes()
+    width = 1 + len(pieces)
+    records = bytearray(count * width)
+    classes = {}
+    for rank, roll in enumerate(dice.outcomes()):
+        canon, t = canonical(dice.roll_mask(roll))
+        classes.setdefault(canon, []).append((rank, t))
+    jobs = ((canon, pieces, backend) for canon in classes)
+    done = 0
+    with Pool(workers) as pool:
+        for canon, sol, stats in pool.imap_unordered(solve_class, jobs, chunksize):
+            for rank, t in classes[canon]:
+                records[rank * width:(rank + 1) * width] = encode(from_canonical(sol, t), pieces)
+            done += 1
+            if done % 1000 == 0 or done == len(classes):
+                print(f"{done}/{len(classes)} classes")
+    header = HEADER.pack(MAGIC, VERSION, len(pieces), "".join(pieces).encode(), placements_crc(), dice_crc(), count)
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(records)
+    os.replace(tmp, path)
+    return count
+
+def verify(path=DB_FILE, resolve=200, backend=DEFAULT_BACKEND, seed=0):
+    # Vérifie chaque solution stockée (placements valides, disjoints, hors
+    # des dés) et re-résout `resolve` tirages marqués sans solution.
+    # Renvoie la liste des rangs en erreur.
+    db = SolutionDB(path)
+    errors = []
+    unsolvable = []
+    try:
+        for rank, roll in enumerate(dice.outcomes()):
+            rec = db.record(rank)
+            if not rec[0] & KNOWN:
+                errors.append(rank)
+                continue
+            if not rec[0] & SOLVABLE:
+                if any(k != ABSENT for k in rec[1:]):
+                    errors.append(rank)
+                unsolvable.append(rank)
+                continue
+            used = dice.roll_mask(roll)
+            for p, k in zip(db.pieces, rec[1:]):
+                if k >= len(PLACEMENTS[p]) or used & PLACEMENTS[p][k]:
+                    errors.append(rank)
+                    break
+                used |= PLACEMENTS[p][k]
+        for rank in random.Random(seed).sample(unsolvable, min(resolve, len(unsolvable))):
+            if solve(blockers_mask(dice.roll_unrank(rank)), db.pieces, backend=backend) is not None:
+                errors.append(rank)
+        print(f"{db.count} tirages, {db.count - len(unsolvable)} avec solution, "
+              f"{min(resolve, len(unsolvable))} sans solution re-résolus, {len(errors)} erreurs")
+    finally:
+        db.close()
+    return errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Base de solutions indexée par rang de tirage.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    b = commands.add_parser("build", help="résout tous les tirages et écrit la base")
+    b.add_argument("-p", "--pieces", default="".join(PIECES), help="pièces à placer, ex. LNTUV")
+    b.add_argument("-b", "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    b.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    v = commands.add_parser("verify", help="contrôle la base")
+    v.add_argument("-r", "--resolve", type=int, default=200, help="tirages sans solution à re-résoudre")
+    v.add_argument("-b", "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    for command in (b, v):
+        command.add_argument("-f", "--file", default=DB_FILE)
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args.file, list(args.pieces), args.backend, args.workers)
+        print(f"{args.file} : {os.path.getsize(args.file)} octets")
+    elif verify(args.file, args.resolve, args.backend):
+        sys.exit(1)
@@ -0,0 +1,53 @@
+import time
+import random
+from functools import partial
+
+import bitboard
+import dlx
+from bitboard import SolveCancelled
+from stats import SolveStats
+from pieces import GRID_SIZE, PIECES, board_mask, blockers_mask
+
+# --- Point d'entrée commun des solvers ---
+
+BACKENDS = {
+    'bitboard': bitboard.solve,
+    'cells': bitboard.solve_cells,
+    'cells-fewest': partial(bitboard.solve_cells, choice="fewest"),
+    'dlx': dlx.solve,
+}
+
+DEFAULT_BACKEND = 'bitboard'
+
+def solve(board, remaining, backend=DEFAULT_BACKEND, stats=None, progress=None):
+    # board : grille 6x6 ('' = libre) ou masque de 36 bits des cases occupées
+    # stats : SolveStats optionnel (noeuds, retours arrière, coupes, temps...)
+    # progress : voir bitboard.PROGRESS_EVERY (suivi et annulation)
+    if backend not in BACKENDS:
+        raise ValueError(f"Solver inconnu : {backend} (disponibles : {', '.join(BACKENDS)})")
+    if not isinstance(board, int):
+        board = board_mask(board)
+    if stats is None:
+        return BACKENDS[backend](board, remaining, progress=progress)
+    start = time.perf_counter()
+    try:
+        return BACKENDS[backend](board, remaining, stats=stats, progress=progress)
+    finally:
+        stats.solves += 1
+        stats.wall_time += time.perf_counter() - start
+
+# --- Comparaison des solvers sur un jeu de tirages fixe ---
+
+def compare(rolls=200, seed=2):
+    rng = random.Random(seed)
+    all_cells = [(r,c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
+    cases = [(blockers_mask(rng.sample(all_cells, 6)), rng.sample(list(PIECES), rng.randint(2, 7)))
+             for _ in range(rolls)]
+    for backend in BACKENDS:
+        stats = SolveStats()
+        solved = sum(solve(b, r, backend=backend, stats=stats) is not None for b, r in cases)
+        print(f"{backend:13} {solved:4} résolus  {stats.nodes:9} noeuds  {stats.backtracks:9} retours  "
+              f"{sum(stats.prunes.values()):7} coupes  {stats.wall_time:7.3f} s")
+
+if __name__ == "__main__":
+    compare()
@@ -0,0 +1,60 @@
+# --- Statistiques de recherche ---
+# Objet optionnel passé aux solvers (stats=...). Sans lui (et sans
+# progress), la recherche ne compte rien (voir bitboard.Trace).
+# on_depth(profondeur, cases occupées) est appelé à chaque noeud exploré.
+
+class SolveStats:
+    def __init__(self, on_depth=None):
+        self.on_depth = on_depth
+        self.solves = 0
+        self.nodes = 0
+        self.backtracks = 0
+        self.prunes = {}          # raison -> nombre de branches coupées
+        self.max_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.wall_time = 0.0
+
+    def prune(self, reason, count=1):
+        if count:
+            self.prunes[reason] = self.prunes.get(reason, 0) + count
+
+    def record(self, nodes, backtracks, prunes, max_depth):
+        # Appelé une fois en fin de recherche avec les compteurs locaux
+        self.nodes += nodes
+        self.backtracks += backtracks
+        for reason, count in prunes.items():
+            self.prune(reason, count)
+        self.max_depth = max(self.max_depth, max_depth)
+
+    def merge(self, other):
+        if isinstance(other, dict):
+            other = SolveStats.from_dict(other)
+        self.solves += other.solves
+        self.record(other.nodes, other.backtracks, other.prunes, other.max_depth)
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.wall_time += other.wall_time
+        return self
+
+    def as_dict(self):
+        return {
+            "solves": self.solves,
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "prunes": dict(self.prunes),
+            "max_depth": self.max_depth,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "wall_time": self.wall_time,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for key, value in data.items():
+            setattr(stats, key, dict(value) if key == "prunes" else value)
+        return stats
+
+    def __repr__(self):
+        return f"SolveStats({self.as_dict()})"
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import argparse
+from multiprocessing import Pool
+
+import dice
+from pieces import PIECES, coord_name
+from solver import solve, BACKENDS, DEFAULT_BACKEND
+from stats import SolveStats
+from symmetry import canonical, from_canonical
+from rank import rank
+from batch import piece_candidates
+
+# --- Balayage de tous les tirages possibles des dés ---
+# Chaque tirage distinct de la table des dés est résolu sur tous les coeurs,
+# une ligne JSON par tirage. Les tirages symétriques (rotations, miroirs)
+# ne sont résolus qu'une fois. Le fichier de résultats sert aussi de point
+# de reprise : relancer la commande saute les tirages déjà présents.
+# --shard I/N ne traite que les classes dont le rang (rank.py) du masque
+# canonique vaut I modulo N, pour répartir le balayage sur N machines.
+# Avant la recherche, batch.py compte d'un coup les placements posables de
+# chaque pièce sur toutes les classes : une classe où une pièce n'a aucun
+# placement est sans solution, et les autres passent leurs pièces au solver
+# de la plus contrainte à la moins contrainte.
+
+def order_pieces(pieces, counts):
+    # None si une pièce ne peut aller nulle part, sinon les pièces triées
+    if 0 in counts:
+        return None
+    return [p for _, p in sorted(zip(counts, pieces), key=lambda x: x[0])]
+
+def solve_class(job):
+    canon, pieces, backend = job
+    stats = SolveStats()
+    sol = solve(canon, pieces, backend=backend, stats=stats)
+    return canon, sol, stats.as_dict()
+
+def roll_result(index, roll, t, canon, sol, stats):
+    sol = from_canonical(sol, t)
+    return {
+        "index": index,
+        "dice": list(roll),
+        "canonical": canon,
+        "solvable": sol is not None,
+        "solution": None if sol is None else {p: [coord_name(r, c) for r, c in coords] for p, coords in sol.items()},
+        "nodes": stats["nodes"],
+        "time": stats["wall_time"],
+        "stats": stats,
+    }
+
+def load_done(path):
+    # Relit les résultats déjà écrits ; une dernière ligne coupée par un
+    # arrêt brutal est tronquée pour que la reprise reparte proprement.
+    done = set()
+    if not os.path.exists(path):
+        return done
+    good = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)["index"])
+            except (ValueError, KeyError):
+                break
+            good += len(line)
+    if good != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good)
+    return done
+
+def sweep(path, pieces=None, backend=DEFAULT_BACKEND, workers=None, chunksize=64, shard=0, shards=1):
+    pieces = list(PIECES) if pieces is None else list(pieces)
+    done = load_done(path)
+    # Un seul tirage résolu par classe de symétrie, les autres s'en déduisent
+    classes = {}
+    total = 0
+    for i, roll in enumerate(dice.outcomes()):
+        canon, t = canonical(dice.roll_mask(roll))
+        if rank(canon) % shards != shard:
+            continue
+        total += 1
+        if i not in done:
+            classes.setdefault(canon, []).append((i, roll, t))
+    canons = list(classes)
+    ordered = [order_pieces(pieces, counts) for counts in piece_candidates(canons, pieces)]
+    jobs = [(canon, order, backend) for canon, order in zip(canons, ordered) if order is not None]
+    count = len(done)
+    start = time.time()
+    # Totaux de cette passe (une fois par classe, pas par tirage)
+    total_stats = SolveStats()
+    with open(path, "a", encoding="utf-8") as out, Pool(workers) as pool:
+        def write(canon, sol, stats):
+            nonlocal count
+            total_stats.merge(stats)
+            for i, roll, t in classes[canon]:
+                out.write(json.dumps(roll_result(i, roll, t, canon, sol, stats)) + "\n")
+                count += 1
+                if count % 1000 == 0 or count == total:
+                    out.flush()
+                    print(f"{count}/{total} tirages ({time.time() - start:.1f} s)")
+        for canon, order in zip(canons, ordered):
+            if order is None:
+                stats = SolveStats()
+                stats.prune("no-placement")
+                write(canon, None, stats.as_dict())
+        for canon, sol, stats in pool.imap_unordered(solve_class, jobs, chunksize):
+            write(canon, sol, stats)
+    with open(path + ".stats.json", "w", encoding="utf-8") as f:
+        json.dump(total_stats.as_dict(), f, indent=2)
+    print(f"{total_stats.solves} classes résolues : {total_stats.nodes} noeuds, {total_stats.backtracks} retours arrière, "
+          f"coupes {total_stats.prunes}, profondeur max {total_stats.max_depth}, {total_stats.wall_time:.1f} s de calcul")
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Résout tous les tirages distincts des dés.")
+    parser.add_argument("-o", "--output", default="sweep.jsonl", help="fichier de résultats (reprise automatique)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("-p", "--pieces", default="".join(PIECES), help="pièces à placer, ex. LNTUV")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--shard", default="0/1", help="part I/N du balayage, ex. 0/4")
+    args = parser.parse_args()
+    shard, shards = map(int, args.shard.split("/"))
+    if not 0 <= shard < shards:
+        parser.error(f"part invalide : {args.shard}")
+    sweep(args.output, list(args.pieces), args.backend, args.workers, args.chunksize, shard, shards)
@@ -0,0 +1,63 @@
+from pieces import GRID_SIZE, CELLS, CELL_COORDS, cell_index, coords_mask, mask_coords
+
+# --- Symétries du plateau (groupe diédral D4) ---
+# Les 4 rotations et 4 réflexions d'un tirage ont les mêmes solutions, à la
+# symétrie près : toutes les orientations des pièces sont autorisées.
+
+N = GRID_SIZE - 1
+TRANSFORMS = [
+    lambda r, c: (r, c),          # identité
+    lambda r, c: (c, N - r),      # rotation 90°
+    lambda r, c: (N - r, N - c),  # rotation 180°
+    lambda r, c: (N - c, r),      # rotation 270°
+    lambda r, c: (r, N - c),      # miroir vertical
+    lambda r, c: (N - r, c),      # miroir horizontal
+    lambda r, c: (c, r),          # diagonale
+    lambda r, c: (N - c, N - r),  # anti-diagonale
+]
+
+# PERMS[t][i] : case d'arrivée de la case i par la transformation t
+PERMS = [[cell_index(*f(*CELL_COORDS[i])) for i in range(CELLS)] for f in TRANSFORMS]
+
+INVERSE = [next(u for u in range(len(PERMS)) if all(PERMS[u][PERMS[t][i]] == i for i in range(CELLS)))
+           for t in range(len(PERMS))]
+
+# Tables par octet : un masque de 36 bits se transforme en 5 lectures
+def _byte_tables(perm):
+    tables = []
+    for chunk in range(0, CELLS, 8):
+        table = []
+        for value in range(256):
+            out = 0
+            for b in range(8):
+                if value >> b & 1 and chunk + b < CELLS:
+                    out |= 1 << perm[chunk + b]
+            table.append(out)
+        tables.append(table)
+    return tables
+
+BYTE_TABLES = [_byte_tables(perm) for perm in PERMS]
+
+def transform(mask, t):
+    t0, t1, t2, t3, t4 = BYTE_TABLES[t]
+    return (t0[mask & 0xFF] | t1[mask >> 8 & 0xFF] | t2[mask >> 16 & 0xFF]
+            | t3[mask >> 24 & 0xFF] | t4[mask >> 32 & 0xFF])
+
+def canonical(mask):
+    # Plus petit masque parmi les 8 images, et la transformation utilisée
+    best, best_t = mask, 0
+    for t in range(1, len(BYTE_TABLES)):
+        m = transform(mask, t)
+        if m < best:
+            best, best_t = m, t
+    return best, best_t
+
+def transform_solution(solution, t):
+    # {pièce: coords} -> même solution vue à travers la transformation t
+    if solution is None:
+        return None
+    return {p: mask_coords(transform(coords_mask(coords), t)) for p, coords in solution.items()}
+
+def from_canonical(solution, t):
+    # Ramène une solution du plateau canonique vers l'orientation d'origine
+    return transform_solution(solution, INVERSE[t])
@@ -1,12 +1,22 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, filedialog
 import time
-import random
-import json
 import configparser
 import threading
 import os
 
+from pieces import board_mask, blockers_mask, coords_mask, fitting_pieces, CELL_COORDS
+from solver import DEFAULT_BACKEND
+from background import BackgroundSolver
+from oracle import SolvabilityOracle
+from hint import HintEngine
+from rolldb import open_db
+import gamelog
+import logwriter
+import replay
+from logparse import normalize
+import dice
+
 CELL_SIZE = 50
 GRID_SIZE = 6
 
@@ -37,6 +47,8 @@ DEFAULT_COLORS = {
 
 LOG_FILE = "games.log"
 SETTINGS_FILE = "settings.ini"
+# Comptage des solutions d'un tirage arrêté à COUNT_CAP (affiché "1000+")
+COUNT_CAP = 1000
 
 class GeniusSquareApp(tk.Tk):
     def __init__(self):
@@ -70,9 +82,21 @@ class GeniusSquareApp(tk.Tk):
         self.replay_moves = []
         self.replay_index = 0
 
+        # Solvabilité du plateau, mise à jour à chaque coup
+        self.oracle = None
+
         self.create_widgets()
         self.bind_all("<Control-z>", lambda e: self.undo())
 
+        # Solver en arrière-plan (voir background.py)
+        self.solver_backend = self.configs.get('Solver', 'backend', fallback=DEFAULT_BACKEND)
+        self.solver = BackgroundSolver(self, self.solver_done, self.solver_progress,
+                                       timeout=self.configs.getfloat('Solver', 'timeout', fallback=30.0))
+        self.counter = BackgroundSolver(self, self.count_done, timeout=self.solver.timeout)
+        self.hints = HintEngine(db=open_db())
+        # Modèle de dés (voir dice.py : "real", "sample6"...)
+        self.dice_variant = self.configs.get('Dice', 'variant', fallback='sample6')
+
     def load_settings(self):
         cfg = configparser.ConfigParser()
         if not os.path.exists(SETTINGS_FILE):
@@ -130,6 +154,21 @@ class GeniusSquareApp(tk.Tk):
         self.btn_abandon = tk.Button(bottom_frame, text="Abandonner (solver)", command=self.abandon)
         self.btn_abandon.pack(side='left', padx=10)
 
+        self.btn_cancel = tk.Button(bottom_frame, text="Annuler le solver", command=self.cancel_solver, state='disabled')
+        self.btn_cancel.pack(side='left', padx=10)
+
+        self.btn_hint = tk.Button(bottom_frame, text="Indice", command=self.hint)
+        self.btn_hint.pack(side='left', padx=10)
+
+        self.solver_label = tk.Label(bottom_frame, text="Solver : -", font=("Arial", 14))
+        self.solver_label.pack(side='left', padx=10)
+
+        self.oracle_label = tk.Label(bottom_frame, text="Plateau : -", font=("Arial", 14))
+        self.oracle_label.pack(side='left', padx=10)
+
+        self.count_label = tk.Label(bottom_frame, text="Solutions : -", font=("Arial", 14))
+        self.count_label.pack(side='left', padx=10)
+
         self.btn_replay = tk.Button(bottom_frame, text="Charger replay", command=self.load_replay)
         self.btn_replay.pack(side='left', padx=10)
 
@@ -141,17 +180,23 @@ class GeniusSquareApp(tk.Tk):
     def new_game(self):
         if self.replay_mode:
             self.stop_replay()
+        if self.solver.running:
+            self.solver.cancel()
 
         self.board = [['' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
         self.placed_pieces.clear()
         self.moves.clear()
         self.elapsed_time = 0
 
-        # Tirage 6 dés (cases noires)
-        all_cells = [(r,c) for r in range(GRID_SIZE) for c in range(GRID_SIZE)]
-        self.dice_positions = random.sample(all_cells, 6)
+        # Tirage des dés (cases noires)
+        self.dice_positions = dice.roll_cells(self.dice_variant)
         for r,c in self.dice_positions:
             self.board[r][c] = '#'
+        # Les 9 pièces ne tiennent jamais : comptage, oracle et indices
+        # portent sur celles qui tiennent
+        self.target = fitting_pieces(blockers_mask(self.dice_positions), list(PIECES))
+        self.oracle = SolvabilityOracle(board_mask(self.board), self.target)
+        self.show_oracle()
 
         # Reset canvas cases
         for (r,c), rect in self.cells.items():
@@ -170,6 +215,8 @@ class GeniusSquareApp(tk.Tk):
         self.update_timer()
 
         self.dice_label.config(text=f"Dés : {self.dice_positions}")
+        self.count_label.config(text="Solutions : calcul...")
+        self.counter.count(blockers_mask(self.dice_positions), self.target, COUNT_CAP)
 
         self.player_label.config(text=f"Joueur : {self.player_name}")
 
@@ -298,8 +345,10 @@ class GeniusSquareApp(tk.Tk):
         new_row = event.y // CELL_SIZE
         new_col = event.x // CELL_SIZE
 
-        # Retire la pièce de sa position précédente
-        if piece_id in self.placed_pieces:
+        # Retire la pièce de sa position précédente (l'oracle ne la voit que
+        # déplacée : place_piece -> oracle.move, une seule évaluation)
+        moved = piece_id in self.placed_pieces
+        if moved:
             for (r,c) in self.placed_pieces[piece_id]:
                 self.board[r][c] = ''
                 self.canvas.itemconfig(self.cells[(r,c)], fill='white')
@@ -315,8 +364,11 @@ class GeniusSquareApp(tk.Tk):
                 self.place_piece(piece_id, old_pos[0], old_pos[1])
             else:
                 # Jamais placé avant ? remet dans pièces à gauche
+                if moved:
+                    self.oracle.remove(piece_id)
                 self.create_piece_widget(piece_id)
 
+        self.show_oracle()
         self.drag_data = {"item": None, "piece_id": None, "start_x": 0, "start_y": 0}
 
     def can_place(self, piece_id, row, col):
@@ -341,6 +393,9 @@ class GeniusSquareApp(tk.Tk):
             self.board[rr][cc] = piece_id
             self.canvas.itemconfig(self.cells[(rr,cc)], fill=color)
             self.placed_pieces[piece_id].append((rr,cc))
+        if self.oracle is not None:
+            self.oracle.place(piece_id, coords_mask(self.placed_pieces[piece_id]))
+            self.show_oracle()
 
     def undo(self):
         if not self.moves:
@@ -355,6 +410,32 @@ class GeniusSquareApp(tk.Tk):
                 self.canvas.itemconfig(self.cells[(r,c)], fill='white')
             del self.placed_pieces[piece_id]
             self.create_piece_widget(piece_id)
+            self.oracle.remove(piece_id)
+            self.show_oracle()
+
+    def hint(self):
+        # Placement tiré d'une solution connue (témoin de l'oracle ou cache)
+        if self.replay_mode or self.oracle is None:
+            return
+        blocked = board_mask([['#' if (r,c) in self.dice_positions else '' for c in range(GRID_SIZE)] for r in range(GRID_SIZE)])
+        witness = self.oracle.witness if self.oracle.status else None
+        result = self.hints.hint(blocked, self.placed_pieces, self.target, witness)
+        latency = self.hints.last_latency * 1000
+        if result is None:
+            self.solver_label.config(text=f"Indice : aucun ({latency:.2f} ms)")
+            return
+        pid, coords = result
+        self.solver_label.config(text=f"Indice : {pid} ({latency:.2f} ms)")
+        for (r,c) in coords:
+            x1, y1 = c*CELL_SIZE, r*CELL_SIZE
+            self.canvas.create_rectangle(x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE,
+                                         fill=self.piece_colors[pid], stipple='gray50', tags="hint")
+        self.after(2000, lambda: self.canvas.delete("hint"))
+
+    def show_oracle(self):
+        # Verdict de l'oracle : encore jouable, impasse, ou inconnu (trop long)
+        text, color = {True: ("jouable", "green"), False: ("impasse", "red"), None: ("?", "black")}[self.oracle.status]
+        self.oracle_label.config(text=f"Plateau {''.join(self.oracle.pieces)} : {text}", fg=color)
 
     def update_timer(self):
         if self.timer_running:
@@ -375,43 +456,58 @@ class GeniusSquareApp(tk.Tk):
             "moves": [{"piece": m[0], "pos": m[1], "timestamp": m[2]} for m in self.moves],
             "duration": self.elapsed_time
         }
-        with open(LOG_FILE, "a") as f:
-            f.write(json.dumps(game_data) + "\n")
+        # Écrit en arrière-plan dans le log et son index (voir logwriter.py)
+        logwriter.log_game(game_data, LOG_FILE)
 
     def load_replay(self):
-        # Ouvre un fichier games.log, choix d'une ligne (partie) et replay
-        path = filedialog.askopenfilename(title="Sélectionner fichier replay", filetypes=[("Log files","*.log"),("All files","*.*")])
+        # Ouvre un fichier games.log (ou de replays binaires, voir replay.py),
+        # choix d'une ligne (partie) et replay
+        path = filedialog.askopenfilename(title="Sélectionner fichier replay", filetypes=[("Log files","*.log"),("Replays","*.gsr"),("All files","*.*")])
         if not path:
             return
-        with open(path, "r") as f:
-            lines = f.readlines()
-        if not lines:
+        logwriter.flush()
+        if replay.is_replay_file(path):
+            count = replay.count_replays(path)
+            read = lambda n: normalize(replay.read_replay(path, n))
+        else:
+            index = gamelog.GameIndex(path)
+            count = len(index)
+            read = index.record
+        if not count:
             messagebox.showerror("Erreur","Fichier vide")
             return
         # Choix ligne par index
-        idx = simpledialog.askinteger("Replay", f"Choisir partie 1-{len(lines)}", minvalue=1, maxvalue=len(lines))
+        idx = simpledialog.askinteger("Replay", f"Choisir partie 1-{count}", minvalue=1, maxvalue=count)
         if not idx:
             return
-        line = lines[idx-1]
         try:
-            data = json.loads(line)
+            game = read(idx-1)
         except Exception as e:
-            messagebox.showerror("Erreur", f"Format JSON invalide: {e}")
+            messagebox.showerror("Erreur", f"Format invalide: {e}")
             return
-        self.start_replay(data)
+        if game is None or game.schema != "pos":
+            # "pos" ancre les offsets bruts de PIECES ; geniusDicee ("position")
+            # ancre une autre orientation, geniusDice2 ("coord") joue case par case
+            messagebox.showerror("Erreur", "Partie illisible ou d'un autre jeu")
+            return
+        self.start_replay(game)
 
-    def start_replay(self, data):
+    def start_replay(self, game):
+        # game : logparse.Game
         self.replay_mode = True
         self.timer_running = False
         self.board = [['' for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
         self.placed_pieces.clear()
         self.moves.clear()
-        self.elapsed_time = data.get("duration", 0)
+        self.elapsed_time = game.duration
 
         # Placer dés
-        self.dice_positions = data.get("dice", [])
+        self.dice_positions = game.dice_coords()
         for r,c in self.dice_positions:
             self.board[r][c] = '#'
+        self.target = fitting_pieces(blockers_mask(self.dice_positions), list(PIECES))
+        self.oracle = SolvabilityOracle(board_mask(self.board), self.target)
+        self.show_oracle()
 
         for (r,c), rect in self.cells.items():
             color = 'black' if (r,c) in self.dice_positions else 'white'
@@ -421,10 +517,10 @@ class GeniusSquareApp(tk.Tk):
             w.destroy()
 
         self.dice_label.config(text=f"Dés : {self.dice_positions}")
-        self.player_label.config(text=f"Joueur : {data.get('player','?')}")
+        self.player_label.config(text=f"Joueur : {game.player or '?'}")
         self.timer_label.config(text=f"Temps : {self.elapsed_time} s")
 
-        self.replay_moves = data.get("moves", [])
+        self.replay_moves = game.moves()
         self.replay_index = 0
         self.after(1000, self.replay_step)
 
@@ -434,9 +530,8 @@ class GeniusSquareApp(tk.Tk):
             self.replay_mode = False
             return
         move = self.replay_moves[self.replay_index]
-        pid = move["piece"]
-        r,c = move["pos"]
-        self.place_piece(pid, r, c)
+        r,c = CELL_COORDS[move.cell]
+        self.place_piece(move.piece, r, c)
         self.replay_index += 1
         self.after(1000, self.replay_step)
 
@@ -445,21 +540,61 @@ class GeniusSquareApp(tk.Tk):
 
     def abandon(self):
         # Appelle le solver pour solution depuis état actuel
-        # Ici stub simple : on demande confirmation et affiche message
         if self.replay_mode:
             messagebox.showinfo("Replay","Pas d'abandon possible en mode replay")
             return
+        if self.solver.running:
+            # Une recherche est déjà en cours (bouton Annuler pour l'arrêter)
+            return
         res = messagebox.askyesno("Abandonner", "Voulez-vous que le solver cherche une solution à partir de cet état ?")
         if not res:
             return
-
-        # On simule le solver
-        solution_found = self.call_solver()
-
-        if solution_found:
-            messagebox.showinfo("Solution trouvée", "Le solver a trouvé une solution valide ! (stub)")
-            # En vrai, on afficherait solution
+        self.call_solver()
+
+    def call_solver(self):
+        # Dés et pièces déjà posées restent en place, le solver place les autres.
+        # La recherche tourne dans un autre processus : la fenêtre reste fluide.
+        remaining = [p for p in PIECES if p not in self.placed_pieces]
+        self.btn_cancel.config(state='normal')
+        self.solver_label.config(text="Solver : recherche...")
+        self.solver.start(board_mask(self.board), remaining, backend=self.solver_backend)
+
+    def cancel_solver(self):
+        self.solver.cancel()
+
+    def solver_progress(self, nodes):
+        self.solver_label.config(text=f"Solver : {nodes} noeuds")
+
+    def solver_done(self, status, solution):
+        self.btn_cancel.config(state='disabled')
+        if status == "done" and solution is not None:
+            self.timer_running = False
+            for pid, coords in solution.items():
+                for (r,c) in coords:
+                    self.canvas.itemconfig(self.cells[(r,c)], fill=self.piece_colors[pid])
+            self.solver_label.config(text="Solver : solution trouvée")
+            messagebox.showinfo("Solution trouvée", "Le solver a trouvé une solution valide !")
+        elif status == "done":
+            self.solver_label.config(text="Solver : pas de solution")
+            messagebox.showinfo("Pas de solution", "Aucune solution trouvée depuis cet état, retirez une pièce et réessayez.")
+        elif status == "timeout":
+            self.solver_label.config(text="Solver : délai dépassé")
+            messagebox.showinfo("Pas de solution", f"Pas de solution en {self.solver.timeout:g} secondes.")
+        elif status == "cancelled":
+            self.solver_label.config(text="Solver : annulé")
         else:
-            messagebox.showinfo("Pas de solution", "Aucune solution trouvée, on retire la plus petite pièce et on réessaie (stub).")                                                                                                                                                                                                                                                                                            
-            def call_solver(self):
-        # Stub: ici tu peux intégrer ton solver réel
+            self.solver_label.config(text="Solver : erreur")
+            messagebox.showerror("Erreur", solution)
+
+    def count_done(self, status, total):
+        # Nombre de solutions du tirage (tout de suite ou depuis l'arrière-plan)
+        if status == "done":
+            self.count_label.config(text=f"Solutions {''.join(self.target)} : {total}" + ("+" if total >= COUNT_CAP else ""))
+        elif status == "timeout":
+            self.count_label.config(text=f"Solutions : > {self.counter.timeout:g} s")
+        elif status == "error":
+            self.count_label.config(text="Solutions : erreur")
+
+if __name__ == "__main__":
+    app = GeniusSquareApp()
+    app.mainloop()